@@ -37,6 +37,8 @@ class Settings(BaseSettings):
     # Database - MongoDB
     mongo_uri: str = Field(default="mongodb://localhost:27017", alias="MONGO_URI")
     mongo_db_name: str = Field(default="studybuddy_ai", alias="MONGO_DB_NAME")
+    mongo_max_pool_size: int = Field(default=100, alias="MONGO_MAX_POOL_SIZE")
+    mongo_min_pool_size: int = Field(default=0, alias="MONGO_MIN_POOL_SIZE")
     
     # File Upload Configuration
     upload_dir: str = Field(default="./uploads", alias="UPLOAD_DIR", description="Directory for storing uploaded files")
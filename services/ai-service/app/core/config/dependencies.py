@@ -35,7 +35,9 @@ def get_attachment_service() -> AttachmentService:
 @lru_cache()
 def get_message_service() -> MessageService:
     """Get message service instance (singleton)"""
-    return MessageService()
+    # Message writes move session counters and activity, so they drop the
+    # session service's cached statistics and recent sessions
+    return MessageService(on_session_change=get_session_service().invalidate_user_caches)
 
 @lru_cache()
 def get_session_service() -> SessionService:
@@ -1,11 +1,13 @@
-from .database import get_client, get_database
-from .mongodb import PyObjectId, MongoBaseConfig
+from .database import aggregate_to_list, get_client, get_database
+from .mongodb import PyObjectId, MongoBaseConfig, parse_object_id
 
 __all__ = [
     # Database connections
     "get_client",
     "get_database",
+    "aggregate_to_list",
     # MongoDB utilities
     "PyObjectId",
     "MongoBaseConfig",
+    "parse_object_id",
 ]
\ No newline at end of file
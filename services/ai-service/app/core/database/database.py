@@ -1,31 +1,41 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from typing import Any, Dict, List, Optional
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
 from bson.codec_options import CodecOptions
 from datetime import timezone
 from app.core.config import get_settings
 
 # Singleton client
-_client: AsyncIOMotorClient | None = None
+_client: AsyncMongoClient | None = None
 
 
-def get_client() -> AsyncIOMotorClient:
+def get_client() -> AsyncMongoClient:
     """
     Return a singleton MongoDB client instance.
     Uses settings from config.py (.env values).
+    
+    This is PyMongo's native asyncio client, so driver calls run on the
+    event loop instead of being dispatched to a thread pool.
     """
     global _client
     if _client is None:
         settings = get_settings()
         mongo_uri = getattr(settings, "mongo_uri", "mongodb://localhost:27017")
+        max_pool_size = getattr(settings, "mongo_max_pool_size", 100)
+        min_pool_size = getattr(settings, "mongo_min_pool_size", 0)
         # Add timezone-aware configuration
-        _client = AsyncIOMotorClient(
+        _client = AsyncMongoClient(
             mongo_uri,
             tz_aware=True,
-            tzinfo=timezone.utc
+            tzinfo=timezone.utc,
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size
         )
     return _client
 
 
-def get_database() -> AsyncIOMotorDatabase:
+def get_database() -> AsyncDatabase:
     """
     Return the MongoDB database instance defined in settings.
     With timezone-aware codec options.
@@ -37,4 +47,17 @@ def get_database() -> AsyncIOMotorDatabase:
     return get_client().get_database(
         db_name,
         codec_options=CodecOptions(tz_aware=True, tzinfo=timezone.utc)
-    )
\ No newline at end of file
+    )
+
+
+async def aggregate_to_list(
+    collection: AsyncCollection,
+    pipeline: List[Dict[str, Any]],
+    length: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run an aggregation and collect its results.
+    Lets a whole aggregation be passed around as one awaitable (e.g. to gather).
+    """
+    cursor = await collection.aggregate(pipeline)
+    return await cursor.to_list(length=length)
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Any, Any as AnyType
 from bson import ObjectId
+from bson.errors import InvalidId
 from pydantic import ConfigDict, GetJsonSchemaHandler
 from pydantic.json_schema import JsonSchemaValue
 from pydantic_core import core_schema
@@ -40,6 +41,14 @@ class PyObjectId(ObjectId):
         raise ValueError("Invalid ObjectId")
 
 
+def parse_object_id(value: str, label: str = "ID") -> ObjectId:
+    """Parse an id from a request, rejecting malformed ids before they reach the database"""
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        raise ValueError(f"Invalid {label}: {value}")
+
+
 class MongoBaseConfig:
     """Base configuration for MongoDB Pydantic models"""
     model_config = ConfigDict(
@@ -1,5 +1,6 @@
 from .logging import setup_logging, get_logger
 from .exceptions import AIServiceError, ModelNotFoundError, RateLimitError
+from .cache import TTLCache
 
 __all__ = [
     # Logging
@@ -9,4 +10,6 @@ __all__ = [
     "AIServiceError",
     "ModelNotFoundError",
     "RateLimitError",
+    # Caching
+    "TTLCache",
 ]
\ No newline at end of file
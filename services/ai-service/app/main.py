@@ -4,7 +4,7 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from app.core.config import get_settings
+from app.core.config import get_settings, get_message_service, get_session_service
 from app.core.utils import setup_logging, get_logger
 from app.routes import health_router, chat_router
 
@@ -23,6 +23,16 @@ async def lifespan(app: FastAPI):
         environment=settings.environment,
         debug=settings.debug
     )
+    # Each collection's indexes are created independently so one failure
+    # does not leave the other collection unindexed
+    try:
+        await get_message_service().ensure_indexes()
+    except Exception as e:
+        logger.error("Failed to create message indexes", error=str(e))
+    try:
+        await get_session_service().ensure_indexes()
+    except Exception as e:
+        logger.error("Failed to create session indexes", error=str(e))
     yield
     # Shutdown
     logger.info("Shutting down StudyBuddy AI Service")
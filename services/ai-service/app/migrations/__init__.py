@@ -0,0 +1,12 @@
+"""
+Database Migrations Module
+
+One-off data migrations, run by hand at deploy time rather than on startup
+"""
+
+from .backfill import backfill_message_counts, backfill_message_user_ids
+
+__all__ = [
+    "backfill_message_counts",
+    "backfill_message_user_ids",
+]
@@ -0,0 +1,91 @@
+"""
+Backfill denormalized fields on documents written before they existed.
+
+Run once after deploying the matching release. Recounting overwrites
+counters that live message writes increment, so run it while traffic is
+quiet:
+
+    poetry run ai-service-backfill
+"""
+
+import asyncio
+from app.core.config import get_settings
+from app.core.database import aggregate_to_list, get_client, get_database
+from app.core.utils import setup_logging, get_logger
+
+logger = get_logger(__name__)
+
+
+async def backfill_message_user_ids() -> None:
+    """
+    Copy the owning session's user_id onto messages stored without one
+    
+    Access checks filter on messages.user_id alone, so legacy documents
+    must carry it.
+    """
+    db = get_database()
+    
+    pipeline = [
+        {"$match": {"user_id": {"$exists": False}}},
+        {"$lookup": {
+            "from": "sessions",
+            "localField": "session_id",
+            "foreignField": "_id",
+            "as": "session"
+        }},
+        {"$unwind": "$session"},
+        {"$project": {"user_id": "$session.user_id"}},
+        {"$merge": {"into": "messages", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}}
+    ]
+    await aggregate_to_list(db.messages, pipeline)
+
+
+async def backfill_message_counts() -> None:
+    """
+    Recount messages per session into the stored message_count
+    
+    Message writes keep the counter current with $inc; this repairs
+    sessions whose counts predate that. Every session is recounted, so
+    sessions whose messages are all gone are reset to 0.
+    """
+    db = get_database()
+    
+    pipeline = [
+        {"$lookup": {
+            "from": "messages",
+            "localField": "_id",
+            "foreignField": "session_id",
+            "pipeline": [{"$project": {"_id": 1}}],
+            "as": "messages"
+        }},
+        {"$project": {"message_count": {"$size": "$messages"}}},
+        {"$merge": {
+            "into": "sessions",
+            "on": "_id",
+            "whenMatched": "merge",
+            "whenNotMatched": "discard"
+        }}
+    ]
+    await aggregate_to_list(db.sessions, pipeline)
+
+
+async def run_backfills() -> None:
+    """Run every backfill in order, then release the database client"""
+    try:
+        logger.info("Backfilling message user ids")
+        await backfill_message_user_ids()
+        logger.info("Recounting session message counts")
+        await backfill_message_counts()
+        logger.info("Backfill complete")
+    finally:
+        await get_client().close()
+
+
+def main():
+    """Entry point for the poetry script"""
+    setup_logging(get_settings().log_level)
+    asyncio.run(run_backfills())
+
+
+if __name__ == "__main__":
+    main()
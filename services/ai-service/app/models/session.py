@@ -186,8 +186,9 @@ class Session(BaseModel):
     
     def update_activity(self) -> None:
         """Update last activity timestamp"""
-        self.last_activity = datetime.now(timezone.utc)
-        self.updated_at = datetime.now(timezone.utc)
+        now = datetime.now(timezone.utc)
+        self.last_activity = now
+        self.updated_at = now
     
     def increment_message_count(self) -> None:
         """Increment message count and update activity"""
@@ -1,7 +1,7 @@
 import asyncio
 import json
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, List, Optional
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
 from fastapi.responses import StreamingResponse
 
@@ -33,6 +33,9 @@ from app.core.config import (
 router = APIRouter(prefix="/api/v1/chats", tags=["chats"])
 logger = get_logger(__name__)
 
+# Longest search text accepted; longer input is rejected before it reaches a query
+MAX_SEARCH_QUERY_LENGTH = 128
+
 # ============================================================================
 # Session Management Routes
 # ============================================================================
@@ -43,9 +46,12 @@ async def get_sessions(
     user: User = Depends(get_current_user),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    search: Optional[str] = Query(None),
+    search: Optional[str] = Query(None, max_length=MAX_SEARCH_QUERY_LENGTH),
     starred: Optional[bool] = Query(None),
-    session_type: Optional[str] = Query(None)
+    session_type: Optional[str] = Query(None),
+    fields: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False)
 ):
     """Get all sessions for the authenticated user"""
     try:
@@ -55,13 +61,18 @@ async def get_sessions(
             offset=offset,
             search=search,
             starred=starred,
-            session_type=session_type
+            session_type=session_type,
+            fields=fields,
+            cursor=cursor,
+            include_total=include_total
         )
         return {
             "success": True,
             "data": sessions,
             "timestamp": datetime.now().isoformat()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting sessions for user {user.id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve sessions")
@@ -108,6 +119,8 @@ async def get_session(
         }
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting session {session_id} for user {user.id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve session")
@@ -132,6 +145,8 @@ async def update_session(
         }
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error updating session {session_id} for user {user.id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to update session")
@@ -149,6 +164,8 @@ async def delete_session(
             raise HTTPException(status_code=404, detail="Session not found")
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error deleting session {session_id} for user {user.id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to delete session")
@@ -163,7 +180,10 @@ async def get_messages(
     user: User = Depends(get_current_user),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    session_id: Optional[str] = Query(None)
+    session_id: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    full: bool = Query(True)
 ):
     """Get messages with optional filtering"""
     try:
@@ -171,13 +191,18 @@ async def get_messages(
             user_id=user.id,
             limit=limit,
             offset=offset,
-            session_id=session_id
+            session_id=session_id,
+            cursor=cursor,
+            include_total=include_total,
+            full=full
         )
         return {
             "success": True,
             "data": messages,
             "timestamp": datetime.now().isoformat()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting messages for user {user.id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve messages")
@@ -206,7 +231,10 @@ async def get_session_messages(
     message_service: MessageServiceDep,
     user: User = Depends(get_current_user),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    full: bool = Query(True)
 ):
     """Get all messages for a specific session"""
     try:
@@ -214,13 +242,18 @@ async def get_session_messages(
             session_id=session_id,
             user_id=user.id,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor,
+            include_total=include_total,
+            full=full
         )
         return {
             "success": True,
             "data": messages,
             "timestamp": datetime.now().isoformat()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting messages for session {session_id}, user {user.id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve session messages")
@@ -500,7 +533,7 @@ async def delete_attachment(
 
 @router.get("/sessions/search")
 async def search_sessions(
-    q: str,
+    q: Annotated[str, Query(max_length=MAX_SEARCH_QUERY_LENGTH)],
     session_service: SessionServiceDep,
     user: User = Depends(get_current_user),
     limit: int = Query(20, ge=1, le=100),
@@ -528,11 +561,14 @@ async def search_sessions(
 @router.get("/sessions/{session_id}/messages/search")
 async def search_session_messages(
     session_id: str,
-    q: str,
+    q: Annotated[str, Query(max_length=MAX_SEARCH_QUERY_LENGTH)],
     message_service: MessageServiceDep,
     user: User = Depends(get_current_user),
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    full: bool = Query(True)
 ):
     """Search messages within a specific session"""
     try:
@@ -541,13 +577,18 @@ async def search_session_messages(
             user_id=user.id,
             query=q,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor,
+            include_total=include_total,
+            full=full
         )
         return {
             "success": True,
             "data": results,
             "timestamp": datetime.now().isoformat()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error searching messages in session {session_id} for user {user.id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to search messages")
@@ -575,6 +616,8 @@ async def star_session(
         }
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error starring session {session_id} for user {user.id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to star session")
@@ -598,6 +641,8 @@ async def unstar_session(
         }
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error unstarring session {session_id} for user {user.id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to unstar session")
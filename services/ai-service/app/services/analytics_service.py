@@ -1,7 +1,8 @@
 import asyncio
 from datetime import datetime, timezone, timedelta
+from functools import cached_property
 from typing import Dict, List, Optional, Any, Tuple
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 from pymongo import ASCENDING, DESCENDING
 from bson import ObjectId
 from app.core.database import get_database
@@ -15,14 +16,10 @@ logger = get_logger(__name__)
 class AnalyticsService:
     """Service for handling analytics and statistics for the chat application"""
     
-    def __init__(self):
-        self.db = None
-    
-    def _get_db(self) -> AsyncIOMotorDatabase:
-        """Get database connection"""
-        if self.db is None:
-            self.db = get_database()
-        return self.db
+    @cached_property
+    def db(self) -> AsyncDatabase:
+        """Database handle, resolved once on first use"""
+        return get_database()
     
     async def get_session_analytics(self, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -36,7 +33,7 @@ class AnalyticsService:
             Dictionary containing session analytics or None if not found
         """
         try:
-            db = self._get_db()
+            db = self.db
             
             # Verify session ownership
             session = await db.sessions.find_one({
@@ -70,7 +67,7 @@ class AnalyticsService:
                 }}
             ]
             
-            message_stats_cursor = db.messages.aggregate(message_pipeline)
+            message_stats_cursor = await db.messages.aggregate(message_pipeline)
             message_stats_list = await message_stats_cursor.to_list(length=1)
             stats = message_stats_list[0] if message_stats_list else {}
             
@@ -105,7 +102,7 @@ class AnalyticsService:
                 }}
             ]
             
-            attachment_stats_cursor = db.messages.aggregate(attachment_pipeline)
+            attachment_stats_cursor = await db.messages.aggregate(attachment_pipeline)
             attachment_stats_list = await attachment_stats_cursor.to_list(length=1)
             attachment_data = attachment_stats_list[0] if attachment_stats_list else {}
             
@@ -128,7 +125,7 @@ class AnalyticsService:
                 }}
             ]
             
-            feedback_stats_cursor = db.message_feedback.aggregate(feedback_pipeline)
+            feedback_stats_cursor = await db.message_feedback.aggregate(feedback_pipeline)
             feedback_stats_list = await feedback_stats_cursor.to_list(length=1)
             feedback_data = feedback_stats_list[0] if feedback_stats_list else {}
             
@@ -160,7 +157,7 @@ class AnalyticsService:
             Dictionary containing user statistics
         """
         try:
-            db = self._get_db()
+            db = self.db
             
             # Calculate date range
             end_date = datetime.now(timezone.utc)
@@ -183,7 +180,7 @@ class AnalyticsService:
                 }}
             ]
             
-            session_stats_cursor = db.sessions.aggregate(session_pipeline)
+            session_stats_cursor = await db.sessions.aggregate(session_pipeline)
             session_stats_list = await session_stats_cursor.to_list(length=1)
             session_data = session_stats_list[0] if session_stats_list else {}
             
@@ -202,7 +199,7 @@ class AnalyticsService:
                 }}
             ]
             
-            message_stats_cursor = db.messages.aggregate(message_pipeline)
+            message_stats_cursor = await db.messages.aggregate(message_pipeline)
             message_stats_list = await message_stats_cursor.to_list(length=1)
             message_data = message_stats_list[0] if message_stats_list else {}
             
@@ -222,7 +219,7 @@ class AnalyticsService:
                 }}
             ]
             
-            attachment_stats_cursor = db.attachments.aggregate(attachment_pipeline)
+            attachment_stats_cursor = await db.attachments.aggregate(attachment_pipeline)
             attachment_stats_list = await attachment_stats_cursor.to_list(length=1)
             attachment_data = attachment_stats_list[0] if attachment_stats_list else {}
             
@@ -267,7 +264,7 @@ class AnalyticsService:
             Dictionary containing system analytics
         """
         try:
-            db = self._get_db()
+            db = self.db
             
             # Verify admin permissions (implement based on your auth system)
             # This is a placeholder - implement actual admin check
@@ -287,7 +284,7 @@ class AnalyticsService:
                 }}
             ]
             
-            user_stats_cursor = db.users.aggregate(user_pipeline)
+            user_stats_cursor = await db.users.aggregate(user_pipeline)
             user_stats_list = await user_stats_cursor.to_list(length=1)
             user_data = user_stats_list[0] if user_stats_list else {}
             
@@ -305,7 +302,7 @@ class AnalyticsService:
                 }}
             ]
             
-            session_stats_cursor = db.sessions.aggregate(session_pipeline)
+            session_stats_cursor = await db.sessions.aggregate(session_pipeline)
             session_stats_list = await session_stats_cursor.to_list(length=1)
             session_data = session_stats_list[0] if session_stats_list else {}
             
@@ -321,7 +318,7 @@ class AnalyticsService:
                 }}
             ]
             
-            message_stats_cursor = db.messages.aggregate(message_pipeline)
+            message_stats_cursor = await db.messages.aggregate(message_pipeline)
             message_stats_list = await message_stats_cursor.to_list(length=1)
             message_data = message_stats_list[0] if message_stats_list else {}
             
@@ -337,7 +334,7 @@ class AnalyticsService:
                 }}
             ]
             
-            attachment_stats_cursor = db.attachments.aggregate(attachment_pipeline)
+            attachment_stats_cursor = await db.attachments.aggregate(attachment_pipeline)
             attachment_stats_list = await attachment_stats_cursor.to_list(length=1)
             attachment_data = attachment_stats_list[0] if attachment_stats_list else {}
             
@@ -378,7 +375,7 @@ class AnalyticsService:
             Dictionary containing trend data
         """
         try:
-            db = self._get_db()
+            db = self.db
             
             end_date = datetime.now(timezone.utc)
             start_date = end_date - timedelta(days=days)
@@ -404,7 +401,7 @@ class AnalyticsService:
                 {"$sort": {"_id": 1}}
             ]
             
-            daily_cursor = db.messages.aggregate(daily_pipeline)
+            daily_cursor = await db.messages.aggregate(daily_pipeline)
             daily_data = await daily_cursor.to_list(length=None)
             
             # Get weekly session counts
@@ -425,7 +422,7 @@ class AnalyticsService:
                 {"$sort": {"_id": 1}}
             ]
             
-            weekly_cursor = db.sessions.aggregate(weekly_pipeline)
+            weekly_cursor = await db.sessions.aggregate(weekly_pipeline)
             weekly_data = await weekly_cursor.to_list(length=None)
             
             # Calculate growth trends
@@ -453,7 +450,7 @@ class AnalyticsService:
     async def _get_session_hourly_distribution(self, session_id: str) -> List[Dict[str, Any]]:
         """Get hourly distribution of messages in a session"""
         try:
-            db = self._get_db()
+            db = self.db
             
             pipeline = [
                 {"$match": {"session_id": ObjectId(session_id)}},
@@ -469,7 +466,7 @@ class AnalyticsService:
                 }}
             ]
             
-            cursor = db.messages.aggregate(pipeline)
+            cursor = await db.messages.aggregate(pipeline)
             return await cursor.to_list(length=None)
             
         except Exception as e:
@@ -479,7 +476,7 @@ class AnalyticsService:
     async def _get_user_usage_patterns(self, user_id: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
         """Get user usage patterns (time of day, day of week, etc.)"""
         try:
-            db = self._get_db()
+            db = self.db
             user_obj_id = ObjectId(user_id)
             
             # Hour of day distribution
@@ -500,7 +497,7 @@ class AnalyticsService:
                 }}
             ]
             
-            hourly_cursor = db.messages.aggregate(hourly_pipeline)
+            hourly_cursor = await db.messages.aggregate(hourly_pipeline)
             hourly_data = await hourly_cursor.to_list(length=None)
             
             # Day of week distribution
@@ -521,7 +518,7 @@ class AnalyticsService:
                 }}
             ]
             
-            dow_cursor = db.messages.aggregate(dow_pipeline)
+            dow_cursor = await db.messages.aggregate(dow_pipeline)
             dow_data = await dow_cursor.to_list(length=None)
             
             return {
@@ -536,7 +533,7 @@ class AnalyticsService:
     async def _get_user_feedback_stats(self, user_id: str, start_date: datetime) -> Dict[str, Any]:
         """Get user feedback statistics"""
         try:
-            db = self._get_db()
+            db = self.db
             user_obj_id = ObjectId(user_id)
             
             pipeline = [
@@ -555,7 +552,7 @@ class AnalyticsService:
                 }}
             ]
             
-            cursor = db.message_feedback.aggregate(pipeline)
+            cursor = await db.message_feedback.aggregate(pipeline)
             result = await cursor.to_list(length=1)
             return result[0] if result else {}
             
@@ -566,7 +563,7 @@ class AnalyticsService:
     async def _get_top_user_sessions(self, user_id: str, days: int) -> List[Dict[str, Any]]:
         """Get top sessions by activity for a user"""
         try:
-            db = self._get_db()
+            db = self.db
             user_obj_id = ObjectId(user_id)
             start_date = datetime.now(timezone.utc) - timedelta(days=days)
             
@@ -591,7 +588,7 @@ class AnalyticsService:
     async def _get_system_daily_activity(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """Get system-wide daily activity"""
         try:
-            db = self._get_db()
+            db = self.db
             
             pipeline = [
                 {"$match": {
@@ -618,7 +615,7 @@ class AnalyticsService:
                 {"$sort": {"date": 1}}
             ]
             
-            cursor = db.messages.aggregate(pipeline)
+            cursor = await db.messages.aggregate(pipeline)
             return await cursor.to_list(length=None)
             
         except Exception as e:
@@ -628,7 +625,7 @@ class AnalyticsService:
     async def _get_top_users_by_activity(self, start_date: datetime, limit: int = 10) -> List[Dict[str, Any]]:
         """Get top users by activity"""
         try:
-            db = self._get_db()
+            db = self.db
             
             pipeline = [
                 {"$match": {"created_at": {"$gte": start_date}}},
@@ -660,7 +657,7 @@ class AnalyticsService:
                 {"$limit": limit}
             ]
             
-            cursor = db.sessions.aggregate(pipeline)
+            cursor = await db.sessions.aggregate(pipeline)
             return await cursor.to_list(length=limit)
             
         except Exception as e:
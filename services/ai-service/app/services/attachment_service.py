@@ -4,11 +4,12 @@ import os
 import hashlib
 import mimetypes
 from datetime import datetime, timezone
+from functools import cached_property
 from typing import Dict, Optional, Any
 from pathlib import Path
 import aiofiles
 from fastapi import UploadFile, HTTPException
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 from bson import ObjectId
 from app.core.database import get_database
 from app.core.config import get_settings
@@ -50,16 +51,14 @@ class AttachmentService:
     }
     
     def __init__(self):
-        self.db = None
         self.storage_path = Path(settings.upload_dir or "./uploads")
         self.storage_path.mkdir(parents=True, exist_ok=True)
         logger.info("AttachmentService initialized with minimal processing capabilities")
     
-    def _get_db(self) -> AsyncIOMotorDatabase:
-        """Get database connection"""
-        if self.db is None:
-            self.db = get_database()
-        return self.db
+    @cached_property
+    def db(self) -> AsyncDatabase:
+        """Database handle, resolved once on first use"""
+        return get_database()
     
     async def create_attachment(
         self, 
@@ -79,7 +78,7 @@ class AttachmentService:
             Dictionary containing attachment information
         """
         try:
-            db = self._get_db()
+            db = self.db
             
             # Validate file
             await self._validate_file(file)
@@ -149,7 +148,7 @@ class AttachmentService:
     async def get_attachment(self, attachment_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific attachment by ID"""
         try:
-            db = self._get_db()
+            db = self.db
             
             attachment = await db.attachments.find_one({
                 "_id": ObjectId(attachment_id),
@@ -183,7 +182,7 @@ class AttachmentService:
     ) -> Dict[str, Any]:
         """Get user's file attachments with optional filtering"""
         try:
-            db = self._get_db()
+            db = self.db
             
             # Build query filter
             query_filter = {"user_id": user_id}
@@ -225,7 +224,7 @@ class AttachmentService:
     async def delete_attachment(self, attachment_id: str, user_id: str) -> bool:
         """Delete an attachment and its file"""
         try:
-            db = self._get_db()
+            db = self.db
             
             # Get attachment info first
             attachment = await self.get_attachment(attachment_id, user_id)
@@ -416,7 +415,7 @@ class AttachmentService:
     async def get_attachment_stats(self, user_id: str) -> Dict[str, Any]:
         """Get attachment statistics for a user"""
         try:
-            db = self._get_db()
+            db = self.db
             
             pipeline = [
                 {"$match": {"user_id": user_id}},
@@ -433,7 +432,7 @@ class AttachmentService:
                 }}
             ]
             
-            cursor = db.attachments.aggregate(pipeline)
+            cursor = await db.attachments.aggregate(pipeline)
             result = await cursor.to_list(length=1)
             stats = result[0] if result else {}
             
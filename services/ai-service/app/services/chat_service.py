@@ -36,8 +36,10 @@ class ChatService:
             attachment_service: Attachment service instance
         """
         self.ai_service = ai_service or AIService()
-        self.message_service = message_service or MessageService()
         self.session_service = session_service or SessionService()
+        self.message_service = message_service or MessageService(
+            on_session_change=self.session_service.invalidate_user_caches
+        )
         self.attachment_service = attachment_service or AttachmentService()
 
     async def generate_response(
@@ -313,8 +315,7 @@ class ChatService:
                 session_id, 
                 user_id, 
                 {
-                    "last_activity": datetime.now().isoformat(),
-                    "message_count": await self._get_session_message_count(session_id)
+                    "last_activity": datetime.now().isoformat()
                 }
             )
             
@@ -373,16 +374,6 @@ class ChatService:
             logger.error(f"Error getting conversation context: {str(e)}")
             return []
     
-    async def _get_session_message_count(self, session_id: str) -> int:
-        """Get total message count for a session"""
-        try:
-            # This would typically be a database query
-            # For now, return a placeholder
-            return 0
-        except Exception as e:
-            logger.error(f"Error getting session message count: {str(e)}")
-            return 0
-    
     def _generate_session_title(self, message_content: str, max_length: int = 50) -> str:
         """
         Generate a session title from the first message
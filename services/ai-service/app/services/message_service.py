@@ -1,29 +1,168 @@
 import asyncio
+import base64
+import json
+import re
 import uuid
+from collections import defaultdict
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Any
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo import ASCENDING, DESCENDING
+from functools import cached_property
+from typing import Callable, Dict, List, Optional, Any
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
 from bson import ObjectId
-from app.core.database import get_database
-from app.core.utils import get_logger
+from app.core.database import aggregate_to_list, get_database, parse_object_id
+from app.core.utils import TTLCache, get_logger
 from app.models.message import Message
-from app.models.session import Session
 
 logger = get_logger(__name__)
 
+# Fields a caller may change through update_message
+ALLOWED_UPDATE_FIELDS = {
+    "content", "status", "completed_at", "regenerated_at",
+    "feedback_score", "feedback_text", "is_pinned", "is_hidden",
+    "tokens_used", "metadata", "attachments", "function_calls",
+    "model_name", "generation_config", "temperature"
+}
+
+# Characters of content kept in list views
+LIST_CONTENT_PREVIEW_LENGTH = 200
+
+# Summary fields returned by list endpoints when a caller opts out of full documents
+LIST_PROJECTION = {
+    "_id": 1,
+    "user_id": 1,
+    "session_id": 1,
+    "role": 1,
+    "status": 1,
+    "message_type": 1,
+    "created_at": 1,
+    "is_pinned": 1,
+    "content": {"$substrCP": ["$content", 0, LIST_CONTENT_PREVIEW_LENGTH]}
+}
+
+# Values Message.to_dict gives fields that stored documents may omit
+MESSAGE_DEFAULTS = {
+    "status": "completed",
+    "message_type": "text",
+    "updated_at": None,
+    "completed_at": None,
+    "regenerated_at": None,
+    "tokens_used": 0,
+    "parent_message_id": None,
+    "thread_id": None,
+    "feedback_score": None,
+    "feedback_text": None,
+    "is_pinned": False,
+    "is_hidden": False,
+    "model_name": None,
+    "temperature": None,
+    "is_flagged": False,
+    "moderation_score": None
+}
+
+# Collection fields Message.to_dict returns empty rather than null
+MESSAGE_COLLECTION_DEFAULTS = {
+    "attachments": list,
+    "function_calls": list,
+    "generation_config": dict,
+    "metadata": dict
+}
+
+# Queries shorter than this are mostly stop words to $text, so use a regex instead
+MIN_TEXT_SEARCH_LENGTH = 3
+
+
+def _doc_to_api(doc: Dict[str, Any], projection: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Convert a raw message document to its API representation
+    
+    Read paths return documents this service wrote itself, so they skip the
+    Message model round trip and only stringify ids and timestamps. Messages
+    are stored without their None fields, so those are filled back in to give
+    the same keys as Message.to_dict; with a projection, only its fields are.
+    """
+    for field, default in MESSAGE_DEFAULTS.items():
+        if projection is None or field in projection:
+            doc.setdefault(field, default)
+    for field, factory in MESSAGE_COLLECTION_DEFAULTS.items():
+        if (projection is None or field in projection) and doc.get(field) is None:
+            doc[field] = factory()
+    
+    doc["id"] = str(doc.pop("_id"))
+    if doc.get("session_id") is not None:
+        doc["session_id"] = str(doc["session_id"])
+    for field in ("created_at", "updated_at", "completed_at", "regenerated_at"):
+        value = doc.get(field)
+        if isinstance(value, datetime):
+            doc[field] = value.isoformat()
+    return doc
+
+
+def _encode_cursor(doc: Dict[str, Any], sort_field: Optional[str] = None) -> str:
+    """
+    Pack a document's keyset position into an opaque token
+    
+    ObjectIds grow with insertion time, so _id alone orders messages
+    chronologically; sort_field is only needed for other orderings (e.g. score).
+    """
+    position = [str(doc["_id"])] if sort_field is None else [str(doc["_id"]), doc[sort_field]]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def _keyset_filter(cursor: str, direction: int, sort_field: Optional[str] = None) -> Dict[str, Any]:
+    """Build a filter selecting documents strictly past a position from _encode_cursor"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        message_id = ObjectId(position[0])
+        value = position[1] if sort_field is not None else None
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+    
+    op = "$lt" if direction == DESCENDING else "$gt"
+    if sort_field is None:
+        return {"_id": {op: message_id}}
+    return {
+        "$or": [
+            {sort_field: {op: value}},
+            {sort_field: value, "_id": {op: message_id}}
+        ]
+    }
+
 
 class MessageService:
     """Service for handling chat message operations"""
     
-    def __init__(self):
-        self.db = None
+    def __init__(self, on_session_change: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            on_session_change: Called with a user_id after a message write changes
+                that user's session counters or activity, so session caches can
+                be dropped (see SessionService.invalidate_user_caches)
+        """
+        self._on_session_change = on_session_change
+        # (session_id, user_id) pairs already verified as owned
+        self._ownership_cache = TTLCache(maxsize=8192, ttl=60)
+        # user_id -> future resolving to that user's message statistics
+        self._stats_cache = TTLCache(maxsize=4096, ttl=60)
+    
+    @cached_property
+    def db(self) -> AsyncDatabase:
+        """Database handle, resolved once on first use"""
+        return get_database()
     
-    def _get_db(self) -> AsyncIOMotorDatabase:
-        """Get database connection"""
-        if self.db is None:
-            self.db = get_database()
-        return self.db
+    async def ensure_indexes(self) -> None:
+        """Create the indexes that message queries rely on"""
+        db = self.db
+        
+        # Keyset pagination and thread windows within a session
+        await db.messages.create_index([("session_id", ASCENDING), ("_id", ASCENDING)])
+        
+        # Full-text search over message content; every content search matches
+        # on owner, so the user_id prefix keeps each search within one user's messages
+        await db.messages.create_index([("user_id", ASCENDING), ("content", "text")])
+        
+        # User-wide listing and statistics filter on the denormalized user_id
+        await db.messages.create_index([("user_id", ASCENDING), ("_id", ASCENDING)])
     
     async def create_message(self, user_id: str, message_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -37,25 +176,7 @@ class MessageService:
             Dictionary containing the created message data
         """
         try:
-            db = self._get_db()
-            
-            # Validate session exists and belongs to user
-            session_id = message_data.get("session_id")
-            if session_id:
-                session_doc = await db.sessions.find_one({
-                    "_id": ObjectId(session_id),
-                    "user_id": user_id
-                })
-                if not session_doc:
-                    raise ValueError("Session not found or access denied")
-                
-                # Load session model to validate it's active
-                session = Session(**session_doc)
-                if not session.is_active:
-                    raise ValueError("Cannot add messages to inactive session")
-                
-                # Keep session_id as string for Message model
-                # message_data["session_id"] is already a string, don't convert it
+            db = self.db
             
             # Create Message instance (validates automatically)
             message = Message(
@@ -70,12 +191,37 @@ class MessageService:
             if "session_id" in message_dict and message_dict["session_id"]:
                 message_dict["session_id"] = ObjectId(message_dict["session_id"])
             
+            session_id = message_dict.get("session_id")
+            if session_id:
+                # Authorize and bump the session counters in one atomic update;
+                # only active sessions owned by the user match
+                session_doc = await db.sessions.find_one_and_update(
+                    {"_id": session_id, "user_id": user_id, "status": "active"},
+                    {
+                        "$inc": {"message_count": 1},
+                        "$set": {
+                            "last_activity": message.created_at,
+                            "updated_at": message.created_at
+                        }
+                    },
+                    projection={"_id": 1}
+                )
+                if not session_doc:
+                    raise ValueError("Session not found, access denied, or inactive")
+            
             # Insert message
-            await db.messages.insert_one(message_dict)
+            try:
+                await db.messages.insert_one(message_dict)
+            except Exception:
+                # Roll back the counter bump so the session stays consistent
+                if session_id:
+                    await db.sessions.update_one(
+                        {"_id": session_id},
+                        {"$inc": {"message_count": -1}}
+                    )
+                raise
             
-            # Update session message count and last activity if session exists
-            if session_id:
-                await self._update_session_stats(session_id)
+            self._invalidate_user_caches(user_id, session_changed=bool(session_id))
             
             logger.info(f"Created message {message.id} for user {user_id}")
             
@@ -97,15 +243,12 @@ class MessageService:
             Dictionary containing message data or None if not found
         """
         try:
-            db = self._get_db()
+            db = self.db
             
             # Find message with user access check
             message_doc = await db.messages.find_one({
                 "_id": ObjectId(message_id),
-                "$or": [
-                    {"user_id": user_id},
-                    {"session_id": {"$in": await self._get_user_session_ids(user_id)}}
-                ]
+                "user_id": user_id
             })
             
             if not message_doc:
@@ -124,7 +267,10 @@ class MessageService:
         user_id: str, 
         limit: int = 50, 
         offset: int = 0,
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        full: bool = True
     ) -> Dict[str, Any]:
         """
         Get messages for a user with optional filtering
@@ -132,50 +278,60 @@ class MessageService:
         Args:
             user_id: ID of the user
             limit: Maximum number of messages to return
-            offset: Number of messages to skip
+            offset: Number of messages to skip (ignored when cursor is given)
             session_id: Optional filter by session ID
+            cursor: Opaque token from a previous page's next_cursor
+            include_total: Also count all matching messages (costly; first page only)
+            full: Return whole documents; pass False for list summaries
             
         Returns:
             Dictionary containing messages and pagination info
         """
         try:
-            db = self._get_db()
+            db = self.db
             
             # Build query filter
             if session_id:
                 # Session-specific query
                 query_filter = {
                     "user_id": user_id,
-                    "session_id": ObjectId(session_id)
+                    "session_id": parse_object_id(session_id, "session ID")
                 }
             else:
-                # User-wide query - include messages from user's sessions
-                user_session_ids = await self._get_user_session_ids(user_id)
-                query_filter = {
-                    "$or": [
-                        {"user_id": user_id},
-                        {"session_id": {"$in": user_session_ids}}
-                    ]
-                }
-            
-            # Get messages with pagination
-            cursor = db.messages.find(query_filter).sort("created_at", DESCENDING).skip(offset).limit(limit)
-            message_docs = await cursor.to_list(length=limit)
-            
-            # Convert to Message models
-            messages = [Message.create_from_dict(doc).to_dict() for doc in message_docs]
-            
-            # Get total count
-            total_count = await db.messages.count_documents(query_filter)
+                # User-wide query - every message carries its owner's user_id
+                query_filter = {"user_id": user_id}
+            
+            base_filter = query_filter
+            if cursor:
+                query_filter = {"$and": [base_filter, _keyset_filter(cursor, DESCENDING)]}
+                offset = 0
+            
+            # Fetch one extra document to detect whether another page exists
+            projection = None if full else LIST_PROJECTION
+            message_cursor = db.messages.find(query_filter, projection).sort(
+                "_id", DESCENDING
+            ).skip(offset).limit(limit + 1).batch_size(limit + 1)
+            message_docs = await message_cursor.to_list(length=limit + 1)
+            
+            has_more = len(message_docs) > limit
+            message_docs = message_docs[:limit]
+            next_cursor = _encode_cursor(message_docs[-1]) if has_more else None
+            
+            # Convert to API shape
+            messages = [_doc_to_api(doc, projection) for doc in message_docs]
+            
+            pagination = {
+                "limit": limit,
+                "offset": offset,
+                "has_more": has_more,
+                "next_cursor": next_cursor
+            }
+            if include_total:
+                pagination["total"] = await db.messages.count_documents(base_filter)
             
             return {
                 "messages": messages,
-                "pagination": {
-                    "total": total_count,
-                    "limit": limit,
-                    "offset": offset,
-                    "has_more": offset + len(messages) < total_count
-                }
+                "pagination": pagination
             }
             
         except Exception as e:
@@ -187,43 +343,58 @@ class MessageService:
         session_id: str, 
         user_id: str, 
         limit: int = 50, 
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        full: bool = True
     ) -> Dict[str, Any]:
         try:
-            db = self._get_db()
-            
-            # Verify session ownership - session _id IS an ObjectId
-            session_doc = await db.sessions.find_one({
-                "_id": ObjectId(session_id),
-                "user_id": user_id
-            })
-            if not session_doc:
-                raise ValueError("Session not found or access denied")
+            db = self.db
             
             # Get messages for the session - session_id is stored as ObjectId in MongoDB
-            cursor = db.messages.find({
-                "session_id": ObjectId(session_id)
-            }).sort("created_at", ASCENDING).skip(offset).limit(limit)
+            session_oid = parse_object_id(session_id, "session ID")
+            base_filter = {"session_id": session_oid}
+            query_filter = dict(base_filter)
+            if cursor:
+                query_filter.update(_keyset_filter(cursor, ASCENDING))
+                offset = 0
+            
+            # Fetch one extra document to detect whether another page exists
+            # Transcripts need whole messages by default; list views can opt out
+            projection = None if full else LIST_PROJECTION
+            message_cursor = db.messages.find(query_filter, projection).sort(
+                "_id", ASCENDING
+            ).skip(offset).limit(limit + 1).batch_size(limit + 1)
+            
+            # Verify session ownership while the page is fetched; the query is
+            # already scoped to the session, so discarding it on failure is cheap
+            is_owner, message_docs = await asyncio.gather(
+                self._verify_session_ownership(session_oid, user_id),
+                message_cursor.to_list(length=limit + 1)
+            )
+            if not is_owner:
+                raise ValueError("Session not found or access denied")
             
-            message_docs = await cursor.to_list(length=limit)
+            has_more = len(message_docs) > limit
+            message_docs = message_docs[:limit]
+            next_cursor = _encode_cursor(message_docs[-1]) if has_more else None
             
-            # Convert to Message models
-            messages = [Message.create_from_dict(doc).to_dict() for doc in message_docs]
+            # Convert to API shape
+            messages = [_doc_to_api(doc, projection) for doc in message_docs]
             
-            # Get total count - also need ObjectId here
-            total_count = await db.messages.count_documents({
-                "session_id": ObjectId(session_id)  # ← FIX: Convert to ObjectId
-            })
+            pagination = {
+                "limit": limit,
+                "offset": offset,
+                "has_more": has_more,
+                "next_cursor": next_cursor
+            }
+            if include_total:
+                pagination["total"] = await db.messages.count_documents(base_filter)
             
             return {
                 "messages": messages,
                 "session_id": session_id,
-                "pagination": {
-                    "total": total_count,
-                    "limit": limit,
-                    "offset": offset,
-                    "has_more": offset + len(messages) < total_count
-                }
+                "pagination": pagination
             }
             
         except Exception as e:
@@ -248,39 +419,33 @@ class MessageService:
             Dictionary containing updated message data or None if not found
         """
         try:
-            db = self._get_db()
-            
-            # Check if message exists and user has access
-            message_doc = await db.messages.find_one({
-                "_id": ObjectId(message_id),
-                "$or": [
-                    {"user_id": user_id},
-                    {"session_id": {"$in": await self._get_user_session_ids(user_id)}}
-                ]
-            })
+            db = self.db
+            
+            # Only whitelisted fields are written; timestamps may arrive as ISO strings
+            update_doc = {}
+            for field, value in update_data.items():
+                if field not in ALLOWED_UPDATE_FIELDS:
+                    continue
+                if field in ("completed_at", "regenerated_at") and isinstance(value, str):
+                    try:
+                        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                    except ValueError:
+                        # Invalid datetime format, skip
+                        continue
+                update_doc[field] = value
+            update_doc["updated_at"] = datetime.now(timezone.utc)
+            
+            # Check access and apply the update in one round trip
+            message_doc = await db.messages.find_one_and_update(
+                {"_id": ObjectId(message_id), "user_id": user_id},
+                {"$set": update_doc},
+                return_document=ReturnDocument.AFTER
+            )
             
             if not message_doc:
                 return None
             
-            # Create Message instance
-            message = Message.create_from_dict(message_doc)
-            
-            # Update fields using the model method
-            message.update_from_dict(update_data)
-            
-            # Convert to dict for database update
-            update_doc = message.model_dump(by_alias=True, exclude_none=True, exclude={"id"})
-            
-            # Execute update
-            result = await db.messages.update_one(
-                {"_id": ObjectId(message_id)},
-                {"$set": update_doc}
-            )
-            
-            if result.modified_count > 0:
-                return message.to_dict()
-            
-            return message.to_dict()
+            return _doc_to_api(message_doc)
             
         except Exception as e:
             logger.error(f"Error updating message {message_id} for user {user_id}: {str(e)}")
@@ -298,27 +463,31 @@ class MessageService:
             True if deleted successfully, False if not found
         """
         try:
-            db = self._get_db()
+            db = self.db
             
-            # Get message to check ownership and get session_id
-            existing_message = await self.get_message(message_id, user_id)
-            if not existing_message:
+            # Check ownership and delete in one atomic call, returning only session_id
+            deleted = await db.messages.find_one_and_delete(
+                {"_id": ObjectId(message_id), "user_id": user_id},
+                projection={"session_id": 1}
+            )
+            if not deleted:
                 return False
             
-            session_id = existing_message.get("session_id")
-            
-            # Delete the message
-            result = await db.messages.delete_one({"_id": ObjectId(message_id)})
+            # Update session message count
+            session_id = deleted.get("session_id")
+            if session_id:
+                await db.sessions.update_one(
+                    {"_id": session_id},
+                    {
+                        "$inc": {"message_count": -1},
+                        "$set": {"updated_at": datetime.now(timezone.utc)}
+                    }
+                )
             
-            if result.deleted_count > 0:
-                # Update session message count
-                if session_id:
-                    await self._update_session_stats(session_id)
-                
-                logger.info(f"Deleted message {message_id} for user {user_id}")
-                return True
+            self._invalidate_user_caches(user_id, session_changed=bool(session_id))
             
-            return False
+            logger.info(f"Deleted message {message_id} for user {user_id}")
+            return True
             
         except Exception as e:
             logger.error(f"Error deleting message {message_id} for user {user_id}: {str(e)}")
@@ -377,17 +546,22 @@ class MessageService:
             Dictionary containing feedback record
         """
         try:
-            db = self._get_db()
+            db = self.db
+            
+            message_oid = ObjectId(message_id)
             
             # Verify message exists and user has access
-            message = await self.get_message(message_id, user_id)
+            message = await db.messages.find_one(
+                {"_id": message_oid, "user_id": user_id},
+                {"_id": 1}
+            )
             if not message:
                 raise ValueError("Message not found or access denied")
             
             # Create feedback document
             feedback_doc = {
                 "_id": ObjectId(),
-                "message_id": ObjectId(message_id),
+                "message_id": message_oid,
                 "user_id": user_id,
                 "rating": feedback_data.get("rating"),
                 "feedback_type": feedback_data.get("type", "general"),
@@ -419,7 +593,10 @@ class MessageService:
         user_id: str, 
         query: str, 
         limit: int = 20, 
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        full: bool = True
     ) -> Dict[str, Any]:
         """
         Search messages within a specific session
@@ -429,72 +606,89 @@ class MessageService:
             user_id: ID of the user
             query: Search query string
             limit: Maximum number of results
-            offset: Number of results to skip
+            offset: Number of results to skip (ignored when cursor is given)
+            cursor: Opaque token from a previous page's next_cursor
+            include_total: Also count all matching messages (costly; first page only)
+            full: Return whole documents; pass False for list summaries
             
         Returns:
             Dictionary containing search results and pagination info
         """
         try:
-            db = self._get_db()
+            db = self.db
             
-            # Verify session ownership
-            session_doc = await db.sessions.find_one({
-                "_id": ObjectId(session_id),
-                "user_id": user_id
-            })
-            if not session_doc:
-                raise ValueError("Session not found or access denied")
-            
-            # Search messages in session using text search
-            search_filter = {
-                "session_id": ObjectId(session_id),
-                "content": {"$regex": query, "$options": "i"}
-            }
-            
-            # Get messages with basic relevance scoring (exact matches first)
-            exact_match_filter = {
-                "session_id": ObjectId(session_id),
-                "content": {"$regex": f"\\b{query}\\b", "$options": "i"}
-            }
+            session_oid = parse_object_id(session_id, "session ID")
             
-            # Get exact matches first
-            exact_cursor = db.messages.find(exact_match_filter).sort("created_at", DESCENDING)
-            exact_message_docs = await exact_cursor.to_list(length=limit)
-            
-            # If we don't have enough exact matches, get partial matches
-            if len(exact_message_docs) < limit:
-                remaining_limit = limit - len(exact_message_docs)
-                partial_cursor = db.messages.find({
-                    **search_filter,
-                    "_id": {"$nin": [msg["_id"] for msg in exact_message_docs]}
-                }).sort("created_at", DESCENDING).skip(offset).limit(remaining_limit)
-                
-                partial_message_docs = await partial_cursor.to_list(length=remaining_limit)
-                message_docs = exact_message_docs + partial_message_docs
+            if len(query.strip()) >= MIN_TEXT_SEARCH_LENGTH:
+                # Rank by text index relevance
+                sort_field = "score"
+                search_filter = {"user_id": user_id, "session_id": session_oid, "$text": {"$search": query}}
+                pipeline = [
+                    {"$match": search_filter},
+                    {"$addFields": {"score": {"$meta": "textScore"}}}
+                ]
             else:
-                message_docs = exact_message_docs[:limit]
+                # Escaped substring match, newest first
+                sort_field = None
+                search_filter = {
+                    "session_id": session_oid,
+                    "content": {"$regex": re.compile(re.escape(query), re.IGNORECASE)}
+                }
+                pipeline = [{"$match": search_filter}]
+            
+            if cursor:
+                pipeline.append({"$match": _keyset_filter(cursor, DESCENDING, sort_field)})
+                offset = 0
+            
+            # Fetch one extra document to detect whether another page exists.
+            # relevance_score keeps its original meaning: 1 for a whole-word
+            # match, 2 for a partial one; the text score only orders results
+            sort_stage = {sort_field: DESCENDING, "_id": DESCENDING} if sort_field else {"_id": DESCENDING}
+            whole_word = rf"\b{re.escape(query)}\b"
+            pipeline.extend([
+                {"$sort": sort_stage},
+                {"$skip": offset},
+                {"$limit": limit + 1},
+                {"$addFields": {"relevance_score": {"$cond": [
+                    {"$regexMatch": {"input": "$content", "regex": whole_word, "options": "i"}}, 1, 2
+                ]}}}
+            ])
+            projection = None if full else LIST_PROJECTION
+            if projection:
+                pipeline.append({"$project": {**projection, "score": 1, "relevance_score": 1}})
+            
+            # Verify session ownership while the search runs
+            is_owner, message_docs = await asyncio.gather(
+                self._verify_session_ownership(session_oid, user_id),
+                aggregate_to_list(db.messages, pipeline, length=limit + 1)
+            )
+            if not is_owner:
+                raise ValueError("Session not found or access denied")
             
-            # Convert to Message models and add relevance score
-            messages = []
-            for i, doc in enumerate(message_docs):
-                message = Message.create_from_dict(doc)
-                message_dict = message.to_dict()
-                message_dict["relevance_score"] = 1 if i < len(exact_message_docs) else 2
-                messages.append(message_dict)
+            has_more = len(message_docs) > limit
+            message_docs = message_docs[:limit]
+            next_cursor = _encode_cursor(message_docs[-1], sort_field) if has_more else None
             
-            # Get total count
-            total_count = await db.messages.count_documents(search_filter)
+            # Convert to API shape; the text score is only needed for the cursor
+            messages = []
+            for doc in message_docs:
+                doc.pop("score", None)
+                messages.append(_doc_to_api(doc, projection))
+            
+            pagination = {
+                "limit": limit,
+                "offset": offset,
+                "has_more": has_more,
+                "next_cursor": next_cursor
+            }
+            if include_total:
+                pagination["total"] = await db.messages.count_documents(search_filter)
             
             return {
                 "messages": messages,
                 "session_id": session_id,
                 "query": query,
-                "pagination": {
-                    "total": total_count,
-                    "limit": limit,
-                    "offset": offset,
-                    "has_more": offset + len(messages) < total_count
-                }
+                "pagination": pagination
             }
             
         except Exception as e:
@@ -513,42 +707,67 @@ class MessageService:
             Dictionary containing deletion results
         """
         try:
-            db = self._get_db()
+            db = self.db
+            
+            # Convert ids once; malformed ids simply count as failures
+            oids = [ObjectId(message_id) for message_id in message_ids if ObjectId.is_valid(message_id)]
+            if not oids:
+                return {
+                    "deleted_count": 0,
+                    "failed_count": len(message_ids),
+                    "total_requested": len(message_ids),
+                    "affected_sessions": 0
+                }
+            
+            # Resolve which requested messages the user may delete, and their sessions
+            authorized_cursor = db.messages.find(
+                {"_id": {"$in": oids}, "user_id": user_id},
+                {"_id": 1, "session_id": 1}
+            )
+            authorized_docs = await authorized_cursor.to_list(length=len(oids))
+            
+            # Per-session deletion counts, applied in a single bulk_write below
+            session_deltas: Dict[ObjectId, int] = defaultdict(int)
+            for doc in authorized_docs:
+                if doc.get("session_id"):
+                    session_deltas[doc["session_id"]] += 1
             
             deleted_count = 0
-            failed_count = 0
-            affected_sessions = set()
+            if authorized_docs:
+                result = await db.messages.delete_many(
+                    {"_id": {"$in": [doc["_id"] for doc in authorized_docs]}}
+                )
+                deleted_count = result.deleted_count
+            failed_count = len(message_ids) - deleted_count
             
-            for message_id in message_ids:
+            # Update session stats for all affected sessions in one round trip
+            if session_deltas:
+                now = datetime.now(timezone.utc)
                 try:
-                    # Get message to track session for stats update
-                    message = await self.get_message(message_id, user_id)
-                    if message:
-                        session_id = message.get("session_id")
-                        if session_id:
-                            affected_sessions.add(session_id)
-                    
-                    success = await self.delete_message(message_id, user_id)
-                    if success:
-                        deleted_count += 1
-                    else:
-                        failed_count += 1
+                    await db.sessions.bulk_write(
+                        [
+                            UpdateOne(
+                                {"_id": session_id},
+                                {
+                                    "$inc": {"message_count": -delta},
+                                    "$set": {"updated_at": now}
+                                }
+                            )
+                            for session_id, delta in session_deltas.items()
+                        ],
+                        ordered=False
+                    )
                 except Exception as e:
-                    logger.error(f"Error deleting message {message_id}: {str(e)}")
-                    failed_count += 1
+                    logger.error(f"Error updating session stats after bulk delete: {str(e)}")
             
-            # Update session stats for affected sessions
-            for session_id in affected_sessions:
-                try:
-                    await self._update_session_stats(session_id)
-                except Exception as e:
-                    logger.error(f"Error updating session stats for {session_id}: {str(e)}")
+            if deleted_count:
+                self._invalidate_user_caches(user_id, session_changed=bool(session_deltas))
             
             return {
                 "deleted_count": deleted_count,
                 "failed_count": failed_count,
                 "total_requested": len(message_ids),
-                "affected_sessions": len(affected_sessions)
+                "affected_sessions": len(session_deltas)
             }
             
         except Exception as e:
@@ -573,43 +792,62 @@ class MessageService:
             Dictionary containing the message thread
         """
         try:
-            db = self._get_db()
+            db = self.db
             
-            # Get the target message
-            target_message = await self.get_message(message_id, user_id)
-            if not target_message:
+            target_oid = ObjectId(message_id)
+            
+            # Get the target message; it is serialized like its context below
+            target_doc = await db.messages.find_one({"_id": target_oid, "user_id": user_id})
+            if not target_doc:
                 raise ValueError("Message not found or access denied")
             
+            session_oid = target_doc.get("session_id")
+            target_message = _doc_to_api(target_doc)
             session_id = target_message.get("session_id")
-            target_created_at = target_message.get("created_at")
             
             if not session_id:
                 return {"messages": [target_message], "target_message_id": message_id}
             
-            # Convert created_at string back to datetime for comparison
-            if isinstance(target_created_at, str):
-                target_created_at = datetime.fromisoformat(target_created_at.replace('Z', '+00:00'))
-            
-            # Get messages before the target message
-            before_cursor = db.messages.find({
-                "session_id": ObjectId(session_id),
-                "created_at": {"$lt": target_created_at}
-            }).sort("created_at", DESCENDING).limit(context_size)
+            # No context requested; $limit and to_list both reject 0
+            if context_size <= 0:
+                return {
+                    "messages": [target_message],
+                    "target_message_id": message_id,
+                    "session_id": session_id,
+                    "total_context": 1
+                }
             
-            before_message_docs = await before_cursor.to_list(length=context_size)
-            before_message_docs.reverse()  # Reverse to get chronological order
+            # Fetch both context windows in one round trip; each branch is an
+            # index-backed range scan on (session_id, _id)
+            pipeline = [
+                {"$match": {
+                    "session_id": session_oid,
+                    "_id": {"$lt": target_oid}
+                }},
+                {"$sort": {"_id": DESCENDING}},
+                {"$limit": context_size},
+                {"$unionWith": {
+                    "coll": "messages",
+                    "pipeline": [
+                        {"$match": {
+                            "session_id": session_oid,
+                            "_id": {"$gt": target_oid}
+                        }},
+                        {"$sort": {"_id": ASCENDING}},
+                        {"$limit": context_size}
+                    ]
+                }}
+            ]
             
-            # Get messages after the target message
-            after_cursor = db.messages.find({
-                "session_id": ObjectId(session_id),
-                "created_at": {"$gt": target_created_at}
-            }).sort("created_at", ASCENDING).limit(context_size)
+            context_docs = await aggregate_to_list(db.messages, pipeline, length=context_size * 2)
             
-            after_message_docs = await after_cursor.to_list(length=context_size)
+            before_message_docs = [doc for doc in context_docs if doc["_id"] < target_oid]
+            before_message_docs.reverse()  # Reverse to get chronological order
+            after_message_docs = [doc for doc in context_docs if doc["_id"] > target_oid]
             
-            # Convert to Message models
-            before_messages = [Message.create_from_dict(doc).to_dict() for doc in before_message_docs]
-            after_messages = [Message.create_from_dict(doc).to_dict() for doc in after_message_docs]
+            # Convert to API shape
+            before_messages = [_doc_to_api(doc) for doc in before_message_docs]
+            after_messages = [_doc_to_api(doc) for doc in after_message_docs]
             
             # Combine all messages
             thread_messages = before_messages + [target_message] + after_messages
@@ -629,6 +867,9 @@ class MessageService:
         """
         Get message statistics for a user
         
+        Results are cached briefly per user. Concurrent misses share a single
+        in-flight aggregation instead of each running their own.
+        
         Args:
             user_id: ID of the user
             
@@ -636,124 +877,75 @@ class MessageService:
             Dictionary containing message statistics
         """
         try:
-            db = self._get_db()
-            
-            # Get user's session IDs
-            user_session_ids = await self._get_user_session_ids(user_id)
-            
-            # Build aggregation pipeline
-            pipeline = [
-                {"$match": {
-                    "$or": [
-                        {"user_id": user_id},
-                        {"session_id": {"$in": user_session_ids}}
-                    ]
-                }},
-                {"$group": {
-                    "_id": None,
-                    "total_messages": {"$sum": 1},
-                    "user_messages": {"$sum": {"$cond": [{"$eq": ["$role", "user"]}, 1, 0]}},
-                    "assistant_messages": {"$sum": {"$cond": [{"$eq": ["$role", "assistant"]}, 1, 0]}},
-                    "completed_messages": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
-                    "generating_messages": {"$sum": {"$cond": [{"$eq": ["$status", "generating"]}, 1, 0]}},
-                    "avg_message_length": {"$avg": {"$strLenCP": "$content"}},
-                    "last_message_created": {"$max": "$created_at"},
-                    "first_message_created": {"$min": "$created_at"}
-                }}
-            ]
-            
-            cursor = db.messages.aggregate(pipeline)
-            result = await cursor.to_list(length=1)
-            stats = result[0] if result else {}
-            
-            # Get recent activity (messages in last 7 days)
-            seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
-            
-            recent_count = await db.messages.count_documents({
-                "$or": [
-                    {"user_id": user_id},
-                    {"session_id": {"$in": user_session_ids}}
-                ],
-                "created_at": {"$gte": seven_days_ago}
-            })
-            
-            stats["recent_messages"] = recent_count
-            
-            return stats
-            
+            return dict(await self._stats_cache.get_or_compute(
+                user_id, lambda: self._compute_message_statistics(user_id)
+            ))
         except Exception as e:
             logger.error(f"Error getting message statistics for user {user_id}: {str(e)}")
             raise
     
-    async def _get_user_session_ids(self, user_id: str) -> List[ObjectId]:
-        """Get list of session IDs belonging to a user"""
-        try:
-            db = self._get_db()
-            
-            cursor = db.sessions.find(
-                {"user_id": user_id},
-                {"_id": 1}
-            )
-            
-            sessions = await cursor.to_list(length=None)
-            return [session["_id"] for session in sessions]
-            
-        except Exception as e:
-            logger.error(f"Error getting user session IDs for {user_id}: {str(e)}")
-            return []
+    async def _compute_message_statistics(self, user_id: str) -> Dict[str, Any]:
+        """Run the message statistics aggregation for a user"""
+        db = self.db
+        
+        # Messages created in the last 7 days are counted in the same pass. This
+        # uses created_at rather than _id, because duplicated messages get fresh
+        # _ids but keep their original created_at
+        seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
+        
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            {"$group": {
+                "_id": None,
+                "total_messages": {"$sum": 1},
+                "recent_messages": {"$sum": {"$cond": [{"$gte": ["$created_at", seven_days_ago]}, 1, 0]}},
+                "user_messages": {"$sum": {"$cond": [{"$eq": ["$role", "user"]}, 1, 0]}},
+                "assistant_messages": {"$sum": {"$cond": [{"$eq": ["$role", "assistant"]}, 1, 0]}},
+                "completed_messages": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+                "generating_messages": {"$sum": {"$cond": [{"$eq": ["$status", "generating"]}, 1, 0]}},
+                "avg_message_length": {"$avg": {"$strLenCP": "$content"}},
+                "last_message_created": {"$max": "$created_at"},
+                "first_message_created": {"$min": "$created_at"}
+            }}
+        ]
+        
+        cursor = await db.messages.aggregate(pipeline)
+        result = await cursor.to_list(length=1)
+        stats = result[0] if result else {"recent_messages": 0}
+        
+        return stats
+    
+    def _invalidate_user_caches(self, user_id: str, session_changed: bool) -> None:
+        """Drop cached statistics after a user's messages change, and session caches if their sessions did"""
+        self._stats_cache.pop(user_id, None)
+        if session_changed and self._on_session_change:
+            self._on_session_change(user_id)
     
-    async def _update_session_stats(self, session_id: str):
+    async def _verify_session_ownership(self, session_oid: ObjectId, user_id: str) -> bool:
         """
-        Update session statistics (message count, last activity)
-        Uses the Session model's methods for consistency
+        Check that a session belongs to a user
+        
+        Positive results are cached briefly so paginated reads of the same
+        session skip the extra round trip.
         
         Args:
-            session_id: ID of the session to update
-        """
-        try:
-            db = self._get_db()
-            
-            # Get current session
-            session_doc = await db.sessions.find_one({"_id": ObjectId(session_id)})
-            if not session_doc:
-                logger.warning(f"Session {session_id} not found for stats update")
-                return
-            
-            # Load Session model
-            session = Session(**session_doc)
-            
-            # Get message count and last message time using aggregation
-            pipeline = [
-                {"$match": {"session_id": ObjectId(session_id)}},
-                {"$group": {
-                    "_id": None,
-                    "message_count": {"$sum": 1},
-                    "last_message_at": {"$max": "$created_at"}
-                }}
-            ]
-            
-            cursor = db.messages.aggregate(pipeline)
-            result = await cursor.to_list(length=1)
-            
-            if result:
-                stats = result[0]
-                
-                # Update session using model methods for consistency
-                session.message_count = stats["message_count"]
-                if stats["last_message_at"]:
-                    session.last_activity = stats["last_message_at"]
-                session.updated_at = datetime.now(timezone.utc)
-                
-                # Save to database
-                await db.sessions.update_one(
-                    {"_id": ObjectId(session_id)},
-                    {"$set": {
-                        "message_count": session.message_count,
-                        "last_activity": session.last_activity,
-                        "updated_at": session.updated_at
-                    }}
-                )
+            session_oid: ObjectId of the session
+            user_id: ID of the user
             
-        except Exception as e:
-            logger.error(f"Error updating session stats for {session_id}: {str(e)}")
-            # Don't raise here as this is a background operation
\ No newline at end of file
+        Returns:
+            True if the session exists and belongs to the user
+        """
+        cache_key = (session_oid, user_id)
+        if self._ownership_cache.get(cache_key):
+            return True
+        
+        db = self.db
+        session_doc = await db.sessions.find_one(
+            {"_id": session_oid, "user_id": user_id},
+            {"_id": 1}
+        )
+        if not session_doc:
+            return False
+        
+        self._ownership_cache.set(cache_key, True)
+        return True
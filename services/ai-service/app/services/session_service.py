@@ -1,27 +1,181 @@
 import asyncio
+import base64
+import json
+import re
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Any
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo import ASCENDING, DESCENDING
+from functools import cached_property
+from typing import Any, Dict, List, Optional, get_args
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError
 from bson import ObjectId
-from app.core.database import get_database
-from app.core.utils import get_logger
-from app.models.session import Session
+from app.core.database import aggregate_to_list, get_database, parse_object_id
+from app.core.utils import TTLCache, get_logger
+from app.models.session import Session, SessionType
 
 logger = get_logger(__name__)
 
+# Fields a caller may change through update_session; message_count is
+# maintained by message writes and updated_at is set here
+ALLOWED_UPDATE_FIELDS = {
+    "title", "session_type", "status", "last_activity", "generation_config",
+    "is_pinned", "is_archived", "tags", "metadata"
+}
+
+SESSION_TYPES = set(get_args(SessionType))
+
+# Recent sessions cached per user; larger requests bypass the cache
+RECENT_SESSIONS_CACHE_LIMIT = 50
+
+# Queries shorter than this are mostly stop words to $text, so use a regex instead
+MIN_TEXT_SEARCH_LENGTH = 3
+
+# Most title matches and most message-matched sessions ranked per search
+MAX_SEARCH_CANDIDATES = 500
+
+# Messages copied per insert_many when duplicating a session
+DUPLICATE_MESSAGE_BATCH_SIZE = 500
+
+# Summary fields returned by session list views
+SESSION_LIST_PROJECTION = {
+    "_id": 1,
+    "user_id": 1,
+    "session_type": 1,
+    "title": 1,
+    "status": 1,
+    "is_pinned": 1,
+    "is_archived": 1,
+    "tags": 1,
+    "message_count": 1,
+    "last_activity": 1,
+    "created_at": 1,
+    "updated_at": 1
+}
+
+
+# Values the Session model would fill in for summary fields missing from legacy documents
+SESSION_SUMMARY_DEFAULTS = {
+    "session_type": "chat",
+    "message_count": 0,
+    "is_pinned": False,
+    "is_archived": False,
+    "created_at": None,
+    "updated_at": None,
+    "last_activity": None
+}
+
+
+def _list_projection(fields: Optional[List[str]] = None) -> Dict[str, int]:
+    """Build a list projection limited to the requested summary fields"""
+    if not fields:
+        return SESSION_LIST_PROJECTION
+    return {"_id": 1, **{field: 1 for field in fields if field in SESSION_LIST_PROJECTION}}
+
+
+def _summary_doc_to_api(
+    doc: Dict[str, Any],
+    projection: Dict[str, int] = SESSION_LIST_PROJECTION
+) -> Dict[str, Any]:
+    """
+    Convert a projected session document to its API representation
+    
+    List views skip the Session model round trip, so the defaults it would
+    apply to legacy documents are filled in here for the projected fields.
+    """
+    doc["id"] = str(doc.pop("_id"))
+    for field, default in SESSION_SUMMARY_DEFAULTS.items():
+        if field in projection:
+            doc.setdefault(field, default)
+    for field in ("created_at", "updated_at", "last_activity"):
+        if isinstance(doc.get(field), datetime):
+            doc[field] = doc[field].isoformat()
+    if "tags" in projection:
+        doc["tags"] = doc.get("tags") or []
+    return doc
+
+
+def _encode_session_cursor(doc: Dict[str, Any]) -> str:
+    """Pack a session's (last_activity, _id) list position into an opaque token"""
+    last_activity = doc.get("last_activity")
+    position = [str(doc["_id"]), last_activity.isoformat() if last_activity else None]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def _session_keyset_filter(cursor: str) -> Dict[str, Any]:
+    """
+    Build a filter selecting sessions listed after a position from _encode_session_cursor
+    
+    Legacy sessions without last_activity sort last, so they follow every dated session.
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        session_oid = ObjectId(position[0])
+        last_activity = datetime.fromisoformat(position[1]) if position[1] else None
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+    
+    if last_activity is None:
+        return {"last_activity": None, "_id": {"$lt": session_oid}}
+    return {
+        "$or": [
+            {"last_activity": {"$lt": last_activity}},
+            {"last_activity": last_activity, "_id": {"$lt": session_oid}},
+            {"last_activity": None}
+        ]
+    }
+
+
+def _copy_object_id(created_at: datetime) -> ObjectId:
+    """
+    Generate a fresh ObjectId whose timestamp is created_at
+    
+    Message feeds page by _id on the assumption that _id order is created_at
+    order. A copied message keeps its original created_at, so its new id takes
+    that timestamp; the rest of the id comes from ObjectId(), whose process
+    counter keeps ids unique and increasing in the order they are generated.
+    """
+    timestamp = int(created_at.timestamp()).to_bytes(4, "big")
+    return ObjectId(timestamp + ObjectId().binary[4:])
+
 
 class SessionService:
     """Service for handling chat session operations"""
     
     def __init__(self):
-        self.db = None
+        # user_id -> future resolving to that user's session statistics
+        self._stats_cache = TTLCache(maxsize=4096, ttl=60)
+        # user_id -> future resolving to that user's most recent sessions
+        self._recent_cache = TTLCache(maxsize=4096, ttl=60)
+    
+    @cached_property
+    def db(self) -> AsyncDatabase:
+        """Database handle, resolved once on first use"""
+        return get_database()
     
-    def _get_db(self) -> AsyncIOMotorDatabase:
-        """Get database connection"""
-        if self.db is None:
-            self.db = get_database()
-        return self.db
+    def invalidate_user_caches(self, user_id: str) -> None:
+        """Drop cached statistics and recent sessions after a user's sessions change"""
+        self._stats_cache.pop(user_id, None)
+        self._recent_cache.pop(user_id, None)
+    
+    async def ensure_indexes(self) -> None:
+        """Create the indexes that session queries rely on"""
+        db = self.db
+        
+        # Session lists filter on owner and archive state, newest activity first;
+        # _id breaks ties so keyset pages follow the index order exactly
+        await db.sessions.create_index([
+            ("user_id", ASCENDING),
+            ("is_archived", ASCENDING),
+            ("last_activity", DESCENDING),
+            ("_id", DESCENDING)
+        ])
+        
+        # Full-text search over session titles; title searches always match on
+        # owner, so the user_id prefix keeps each search within one user's entries
+        await db.sessions.create_index([("user_id", ASCENDING), ("title", "text")])
+        
+        # Statistics and status-scoped lookups per user
+        await db.sessions.create_index([("user_id", ASCENDING), ("status", ASCENDING)])
     
     async def create_session(self, user_id: str, session_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -35,7 +189,11 @@ class SessionService:
             Dictionary containing the created session data
         """
         try:
-            db = self._get_db()
+            db = self.db
+            
+            # Stamp all three timestamps from one clock read so a new session
+            # sorts and counts as recently active straight away
+            now = datetime.now(timezone.utc)
             
             # Create Session model instance
             session = Session(
@@ -47,7 +205,10 @@ class SessionService:
                 is_archived=session_data.get("is_archived", False),
                 tags=session_data.get("tags", []),
                 status=session_data.get("status", "active"),
-                session_type=session_data.get("session_type")
+                session_type=session_data.get("session_type"),
+                created_at=now,
+                updated_at=now,
+                last_activity=now
             )
             
             # Convert to dict for MongoDB insertion
@@ -57,6 +218,7 @@ class SessionService:
             result = await db.sessions.insert_one(session_dict)
             session.id = result.inserted_id
             
+            self.invalidate_user_caches(user_id)
             logger.info(f"Created session {session.id} for user {user_id}")
             
             return session.to_dict()
@@ -77,24 +239,20 @@ class SessionService:
             Dictionary containing session data or None if not found
         """
         try:
-            db = self._get_db()
+            db = self.db
+            
+            session_oid = parse_object_id(session_id, "session ID")
             
             # Find session with user ownership check
             session_doc = await db.sessions.find_one({
-                "_id": ObjectId(session_id),
+                "_id": session_oid,
                 "user_id": user_id
             })
             
             if not session_doc:
                 return None
             
-            # Get message count from database
-            message_count = await db.messages.count_documents({
-                "session_id": ObjectId(session_id)
-            })
-            
             # Create Session model instance
-            session_doc["message_count"] = message_count
             session = Session(**session_doc)
             
             return session.to_dict()
@@ -113,7 +271,10 @@ class SessionService:
         pinned: Optional[bool] = None,
         archived: Optional[bool] = None,
         tags: Optional[List[str]] = None,
-        session_type: Optional[str] = None
+        session_type: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = False
     ) -> Dict[str, Any]:
         """
         Get all sessions for a user with optional filtering
@@ -121,25 +282,29 @@ class SessionService:
         Args:
             user_id: ID of the user
             limit: Maximum number of sessions to return
-            offset: Number of sessions to skip
+            offset: Number of sessions to skip (ignored when cursor is given)
             search: Optional search query for session titles
             starred: Optional filter for starred sessions (legacy, maps to pinned)
             pinned: Optional filter for pinned sessions
             archived: Optional filter for archived sessions
             tags: Optional filter for sessions with specific tags
             session_type: Optional filter for session type (e.g., 'chat', 'voice', 'video')
+            fields: Optional subset of summary fields to return (id is always included)
+            cursor: Opaque token from a previous page's next_cursor
+            include_total: Also count all matching sessions (costly; first page only)
             
         Returns:
             Dictionary containing sessions and pagination info
         """
         try:
-            db = self._get_db()
+            db = self.db
             
             # Build query filter
             query_filter = {"user_id": user_id}
             
             if search:
-                query_filter["title"] = {"$regex": search, "$options": "i"}
+                # Escaped so user input is matched literally, never run as a pattern
+                query_filter["title"] = re.compile(re.escape(search), re.IGNORECASE)
             
             # Support both starred (legacy) and pinned
             if starred is not None or pinned is not None:
@@ -158,48 +323,44 @@ class SessionService:
             if session_type:
                 query_filter["session_type"] = session_type
             
-            # Get sessions with pagination using aggregation to include message count
-            pipeline = [
-                {"$match": query_filter},
-                {"$lookup": {
-                    "from": "messages",
-                    "localField": "_id",
-                    "foreignField": "session_id",
-                    "as": "messages"
-                }},
-                {"$addFields": {
-                    "message_count": {"$size": "$messages"}
-                }},
-                {"$project": {"messages": 0}},  # Remove the messages array
-                {"$sort": {"last_activity": DESCENDING}},
-                {"$skip": offset},
-                {"$limit": limit}
-            ]
-            
-            cursor = db.sessions.aggregate(pipeline)
-            session_docs = await cursor.to_list(length=limit)
-            
-            # Convert to Session models
-            sessions = []
-            for doc in session_docs:
-                try:
-                    session = Session(**doc)
-                    sessions.append(session.to_dict())
-                except Exception as e:
-                    logger.error(f"Error converting session document: {str(e)}")
-                    continue
-            
-            # Get total count for pagination
-            total_count = await db.sessions.count_documents(query_filter)
+            base_filter = query_filter
+            if cursor:
+                query_filter = {"$and": [base_filter, _session_keyset_filter(cursor)]}
+                offset = 0
+            
+            # Page along the (user_id, is_archived, last_activity, _id) index and
+            # fetch one extra document to detect whether another page exists;
+            # last_activity is always read because the next cursor is built from it
+            projection = _list_projection(fields)
+            session_cursor = db.sessions.find(
+                query_filter, {**projection, "last_activity": 1}
+            ).sort([
+                ("last_activity", DESCENDING),
+                ("_id", DESCENDING)
+            ]).skip(offset).limit(limit + 1).batch_size(limit + 1)
+            session_docs = await session_cursor.to_list(length=limit + 1)
+            
+            has_more = len(session_docs) > limit
+            session_docs = session_docs[:limit]
+            next_cursor = _encode_session_cursor(session_docs[-1]) if has_more else None
+            
+            sessions = [_summary_doc_to_api(doc, projection) for doc in session_docs]
+            if "last_activity" not in projection:
+                for session in sessions:
+                    session.pop("last_activity", None)
+            
+            pagination = {
+                "limit": limit,
+                "offset": offset,
+                "has_more": has_more,
+                "next_cursor": next_cursor
+            }
+            if include_total:
+                pagination["total"] = await db.sessions.count_documents(base_filter)
             
             return {
                 "sessions": sessions,
-                "pagination": {
-                    "total": total_count,
-                    "limit": limit,
-                    "offset": offset,
-                    "has_more": offset + len(sessions) < total_count
-                }
+                "pagination": pagination
             }
             
         except Exception as e:
@@ -224,19 +385,9 @@ class SessionService:
             Dictionary containing updated session data or None if not found
         """
         try:
-            db = self._get_db()
+            db = self.db
             
-            # Check if session exists and belongs to user
-            session_doc = await db.sessions.find_one({
-                "_id": ObjectId(session_id),
-                "user_id": user_id
-            })
-            
-            if not session_doc:
-                return None
-            
-            # Create Session model instance
-            session = Session(**session_doc)
+            session_oid = parse_object_id(session_id, "session ID")
             
             # Map legacy field names
             if "is_starred" in update_data:
@@ -244,26 +395,38 @@ class SessionService:
             if "model_config" in update_data:
                 update_data["generation_config"] = update_data.pop("model_config")
             
-            # Update the session model
-            session.update_from_dict(update_data)
-            
-            # Convert to dict for MongoDB update
-            update_doc = session.model_dump(by_alias=True, exclude={"id"}, exclude_none=True)
-            
-            # Execute update
-            result = await db.sessions.update_one(
+            # Build the $set patch; None values leave the stored field unchanged
+            set_doc = {
+                field: value for field, value in update_data.items()
+                if field in ALLOWED_UPDATE_FIELDS and value is not None
+            }
+            if "session_type" in set_doc and set_doc["session_type"] not in SESSION_TYPES:
+                raise ValueError(f"Invalid session type: {set_doc['session_type']}")
+            if isinstance(set_doc.get("last_activity"), str):
+                try:
+                    set_doc["last_activity"] = datetime.fromisoformat(
+                        set_doc["last_activity"].replace('Z', '+00:00')
+                    )
+                except ValueError:
+                    # Invalid datetime format, skip
+                    set_doc.pop("last_activity")
+            set_doc["updated_at"] = datetime.now(timezone.utc)
+            
+            # Apply the patch and read back the result in one round trip
+            session_doc = await db.sessions.find_one_and_update(
                 {
-                    "_id": ObjectId(session_id),
+                    "_id": session_oid,
                     "user_id": user_id
                 },
-                {"$set": update_doc}
+                {"$set": set_doc},
+                return_document=ReturnDocument.AFTER
             )
             
-            if result.modified_count > 0:
-                # Return updated session
-                return await self.get_session(session_id, user_id)
+            if not session_doc:
+                return None
             
-            return session.to_dict()
+            self.invalidate_user_caches(user_id)
+            return Session(**session_doc).to_dict()
             
         except Exception as e:
             logger.error(f"Error updating session {session_id} for user {user_id}: {str(e)}")
@@ -282,45 +445,39 @@ class SessionService:
             True if deleted successfully, False if not found
         """
         try:
-            db = self._get_db()
-            
-            # Check if session exists and belongs to user
-            session_doc = await db.sessions.find_one({
-                "_id": ObjectId(session_id),
-                "user_id": user_id
-            })
+            db = self.db
             
-            if not session_doc:
-                return False
+            session_oid = parse_object_id(session_id, "session ID")
             
             if soft:
-                # Soft delete - update status
-                session = Session(**session_doc)
-                session.soft_delete()
-                
+                # Soft delete - flag the session if it exists and belongs to the
+                # user, in a single conditional update. Deleting an already
+                # deleted session matches too, so repeat deletes still succeed
                 result = await db.sessions.update_one(
-                    {"_id": ObjectId(session_id)},
+                    {
+                        "_id": session_oid,
+                        "user_id": user_id
+                    },
                     {"$set": {
-                        "status": session.status,
-                        "updated_at": session.updated_at
+                        "status": "deleted",
+                        "updated_at": datetime.now(timezone.utc)
                     }}
                 )
                 
-                if result.modified_count > 0:
+                if result.matched_count > 0:
+                    self.invalidate_user_caches(user_id)
                     logger.info(f"Soft deleted session {session_id} for user {user_id}")
                     return True
             else:
-                # Hard delete - remove from database
-                # Delete associated messages first
-                await db.messages.delete_many({"session_id": ObjectId(session_id)})
-                
-                # Delete the session
-                result = await db.sessions.delete_one({
-                    "_id": ObjectId(session_id),
-                    "user_id": user_id
-                })
+                # Hard delete - remove the session and its messages concurrently;
+                # both filters are scoped to the owner, so no read is needed first
+                _, result = await asyncio.gather(
+                    db.messages.delete_many({"session_id": session_oid, "user_id": user_id}),
+                    db.sessions.delete_one({"_id": session_oid, "user_id": user_id})
+                )
                 
                 if result.deleted_count > 0:
+                    self.invalidate_user_caches(user_id)
                     logger.info(f"Hard deleted session {session_id} for user {user_id}")
                     return True
             
@@ -342,29 +499,28 @@ class SessionService:
             Updated session data or None if not found
         """
         try:
-            db = self._get_db()
+            db = self.db
             
-            session_doc = await db.sessions.find_one({
-                "_id": ObjectId(session_id),
-                "user_id": user_id
-            })
-            
-            if not session_doc:
-                return None
+            session_oid = parse_object_id(session_id, "session ID")
             
-            session = Session(**session_doc)
-            session.archive()
-            
-            await db.sessions.update_one(
-                {"_id": ObjectId(session_id)},
+            session_doc = await db.sessions.find_one_and_update(
+                {
+                    "_id": session_oid,
+                    "user_id": user_id
+                },
                 {"$set": {
-                    "is_archived": session.is_archived,
-                    "status": session.status,
-                    "updated_at": session.updated_at
-                }}
+                    "is_archived": True,
+                    "status": "archived",
+                    "updated_at": datetime.now(timezone.utc)
+                }},
+                return_document=ReturnDocument.AFTER
             )
             
-            return session.to_dict()
+            if not session_doc:
+                return None
+            
+            self.invalidate_user_caches(user_id)
+            return Session(**session_doc).to_dict()
             
         except Exception as e:
             logger.error(f"Error archiving session {session_id}: {str(e)}")
@@ -382,29 +538,28 @@ class SessionService:
             Updated session data or None if not found
         """
         try:
-            db = self._get_db()
+            db = self.db
             
-            session_doc = await db.sessions.find_one({
-                "_id": ObjectId(session_id),
-                "user_id": user_id
-            })
-            
-            if not session_doc:
-                return None
-            
-            session = Session(**session_doc)
-            session.restore()
+            session_oid = parse_object_id(session_id, "session ID")
             
-            await db.sessions.update_one(
-                {"_id": ObjectId(session_id)},
+            session_doc = await db.sessions.find_one_and_update(
+                {
+                    "_id": session_oid,
+                    "user_id": user_id
+                },
                 {"$set": {
-                    "is_archived": session.is_archived,
-                    "status": session.status,
-                    "updated_at": session.updated_at
-                }}
+                    "is_archived": False,
+                    "status": "active",
+                    "updated_at": datetime.now(timezone.utc)
+                }},
+                return_document=ReturnDocument.AFTER
             )
             
-            return session.to_dict()
+            if not session_doc:
+                return None
+            
+            self.invalidate_user_caches(user_id)
+            return Session(**session_doc).to_dict()
             
         except Exception as e:
             logger.error(f"Error restoring session {session_id}: {str(e)}")
@@ -415,7 +570,8 @@ class SessionService:
         user_id: str, 
         query: str, 
         limit: int = 20, 
-        offset: int = 0
+        offset: int = 0,
+        session_type: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Search sessions by title and content
@@ -425,109 +581,85 @@ class SessionService:
             query: Search query string
             limit: Maximum number of results
             offset: Number of results to skip
+            session_type: Optional filter for session type
             
         Returns:
             Dictionary containing search results and pagination info
         """
         try:
-            db = self._get_db()
-            
-            # Create aggregation pipeline for searching sessions and their messages
-            pipeline = [
-                {"$match": {"user_id": user_id}},
-                {"$lookup": {
-                    "from": "messages",
-                    "localField": "_id",
-                    "foreignField": "session_id",
-                    "as": "messages"
-                }},
-                {"$addFields": {
-                    "title_match": {
-                        "$regexMatch": {
-                            "input": "$title",
-                            "regex": query,
-                            "options": "i"
-                        }
-                    },
-                    "content_match": {
-                        "$anyElementTrue": {
-                            "$map": {
-                                "input": "$messages",
-                                "as": "message",
-                                "in": {
-                                    "$regexMatch": {
-                                        "input": "$$message.content",
-                                        "regex": query,
-                                        "options": "i"
-                                    }
-                                }
-                            }
-                        }
-                    },
-                    "message_count": {"$size": "$messages"}
-                }},
-                {"$match": {
-                    "$or": [
-                        {"title_match": True},
-                        {"content_match": True}
-                    ]
-                }},
-                {"$addFields": {
-                    "relevance_score": {
-                        "$cond": [
-                            {"$eq": ["$title_match", True]},
-                            1,
-                            2
-                        ]
-                    }
-                }},
-                {"$project": {
-                    "messages": 0,
-                    "title_match": 0,
-                    "content_match": 0
-                }},
-                {"$sort": {
-                    "relevance_score": ASCENDING,
-                    "last_activity": DESCENDING
-                }},
-                {"$skip": offset},
-                {"$limit": limit}
-            ]
+            db = self.db
+            
+            if len(query.strip()) >= MIN_TEXT_SEARCH_LENGTH:
+                # Use the title and content text indexes, keeping their relevance
+                title_filter = {"user_id": user_id, "$text": {"$search": query}}
+                content_filter = {"user_id": user_id, "$text": {"$search": query}}
+                score = {"$meta": "textScore"}
+                title_sort = [("score", score)]
+            else:
+                # Too short for the text index; escaped substring match
+                pattern = re.compile(re.escape(query), re.IGNORECASE)
+                title_filter = {"user_id": user_id, "title": pattern}
+                content_filter = {"user_id": user_id, "content": pattern}
+                score = {"$literal": 0}
+                title_sort = [("_id", DESCENDING)]
+            
+            # Find the best-scoring title matches and the sessions of the
+            # best-scoring messages concurrently, each capped to bound the work
+            title_docs, content_docs = await asyncio.gather(
+                db.sessions.find(title_filter, {"_id": 1, "score": score}).sort(
+                    title_sort
+                ).limit(MAX_SEARCH_CANDIDATES).to_list(length=MAX_SEARCH_CANDIDATES),
+                aggregate_to_list(db.messages, [
+                    {"$match": content_filter},
+                    {"$addFields": {"score": score}},
+                    {"$group": {"_id": "$session_id", "score": {"$max": "$score"}}},
+                    {"$sort": {"score": DESCENDING, "_id": DESCENDING}},
+                    {"$limit": MAX_SEARCH_CANDIDATES}
+                ])
+            )
             
-            cursor = db.sessions.aggregate(pipeline)
-            session_docs = await cursor.to_list(length=limit)
+            # Scores from the two text indexes are not comparable, so keep them apart
+            title_scores = {doc["_id"]: doc.get("score") or 0 for doc in title_docs}
+            content_scores = {doc["_id"]: doc.get("score") or 0 for doc in content_docs}
+            candidate_ids = list(title_scores.keys() | content_scores.keys())
             
-            # Convert to Session models
             sessions = []
-            for doc in session_docs:
-                try:
-                    session = Session(**doc)
-                    sessions.append(session.to_dict())
-                except Exception as e:
-                    logger.error(f"Error converting session document: {str(e)}")
-                    continue
-            
-            # Get total count for search results
-            count_pipeline = [
-                {"$match": {"user_id": user_id}},
-                {"$lookup": {
-                    "from": "messages",
-                    "localField": "_id",
-                    "foreignField": "session_id",
-                    "as": "messages"
-                }},
-                {"$match": {
-                    "$or": [
-                        {"title": {"$regex": query, "$options": "i"}},
-                        {"messages.content": {"$regex": query, "$options": "i"}}
+            total_count = 0
+            if candidate_ids:
+                session_filter = {"_id": {"$in": candidate_ids}, "user_id": user_id}
+                if session_type:
+                    session_filter["session_type"] = session_type
+                
+                candidates = await db.sessions.find(
+                    session_filter, {"_id": 1, "last_activity": 1}
+                ).to_list(length=None)
+                
+                # Title matches rank ahead of content-only matches, then by each
+                # index's own relevance, then by most recent activity
+                def rank(doc: Dict[str, Any]) -> tuple:
+                    oid = doc["_id"]
+                    last_activity = doc.get("last_activity")
+                    return (
+                        0 if oid in title_scores else 1,
+                        -title_scores.get(oid, 0),
+                        -content_scores.get(oid, 0),
+                        -(last_activity.timestamp() if last_activity else 0)
+                    )
+                
+                ranked_ids = [doc["_id"] for doc in sorted(candidates, key=rank)]
+                total_count = len(ranked_ids)
+                page_ids = ranked_ids[offset:offset + limit]
+                
+                # Fetch summaries for just this page and restore the ranked order
+                if page_ids:
+                    page_docs = await db.sessions.find(
+                        {"_id": {"$in": page_ids}}, SESSION_LIST_PROJECTION
+                    ).to_list(length=len(page_ids))
+                    docs_by_id = {doc["_id"]: doc for doc in page_docs}
+                    sessions = [
+                        _summary_doc_to_api(docs_by_id[oid])
+                        for oid in page_ids if oid in docs_by_id
                     ]
-                }},
-                {"$count": "total"}
-            ]
-            
-            count_cursor = db.sessions.aggregate(count_pipeline)
-            count_result = await count_cursor.to_list(length=1)
-            total_count = count_result[0]["total"] if count_result else 0
             
             return {
                 "sessions": sessions,
@@ -555,7 +687,7 @@ class SessionService:
         Returns:
             Updated session data or None if not found
         """
-        return await self.update_session(session_id, user_id, {"is_pinned": True})
+        return await self._set_pinned(session_id, user_id, True)
     
     async def unstar_session(self, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -568,7 +700,7 @@ class SessionService:
         Returns:
             Updated session data or None if not found
         """
-        return await self.update_session(session_id, user_id, {"is_pinned": False})
+        return await self._set_pinned(session_id, user_id, False)
     
     async def pin_session(self, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -581,7 +713,7 @@ class SessionService:
         Returns:
             Updated session data or None if not found
         """
-        return await self.update_session(session_id, user_id, {"is_pinned": True})
+        return await self._set_pinned(session_id, user_id, True)
     
     async def unpin_session(self, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -594,7 +726,36 @@ class SessionService:
         Returns:
             Updated session data or None if not found
         """
-        return await self.update_session(session_id, user_id, {"is_pinned": False})
+        return await self._set_pinned(session_id, user_id, False)
+    
+    async def _set_pinned(self, session_id: str, user_id: str, pinned: bool) -> Optional[Dict[str, Any]]:
+        """Flip a session's pinned flag with a single conditional update"""
+        try:
+            db = self.db
+            
+            session_oid = parse_object_id(session_id, "session ID")
+            
+            session_doc = await db.sessions.find_one_and_update(
+                {
+                    "_id": session_oid,
+                    "user_id": user_id
+                },
+                {"$set": {
+                    "is_pinned": pinned,
+                    "updated_at": datetime.now(timezone.utc)
+                }},
+                return_document=ReturnDocument.AFTER
+            )
+            
+            if not session_doc:
+                return None
+            
+            self.invalidate_user_caches(user_id)
+            return Session(**session_doc).to_dict()
+            
+        except Exception as e:
+            logger.error(f"Error setting pinned={pinned} on session {session_id}: {str(e)}")
+            raise
     
     async def bulk_delete_sessions(self, session_ids: List[str], user_id: str, soft: bool = True) -> Dict[str, Any]:
         """
@@ -609,19 +770,36 @@ class SessionService:
             Dictionary containing deletion results
         """
         try:
-            deleted_count = 0
-            failed_count = 0
+            db = self.db
             
-            for session_id in session_ids:
-                try:
-                    success = await self.delete_session(session_id, user_id, soft=soft)
-                    if success:
-                        deleted_count += 1
-                    else:
-                        failed_count += 1
-                except Exception as e:
-                    logger.error(f"Error deleting session {session_id}: {str(e)}")
-                    failed_count += 1
+            # Convert ids once; malformed ids simply count as failures
+            oids = [ObjectId(session_id) for session_id in session_ids if ObjectId.is_valid(session_id)]
+            
+            deleted_count = 0
+            if oids:
+                owned_filter = {"_id": {"$in": oids}, "user_id": user_id}
+                if soft:
+                    # Soft delete - flag every owned session in one update; sessions
+                    # that were already deleted match too and count as deleted
+                    result = await db.sessions.update_many(
+                        owned_filter,
+                        {"$set": {
+                            "status": "deleted",
+                            "updated_at": datetime.now(timezone.utc)
+                        }}
+                    )
+                    deleted_count = result.matched_count
+                else:
+                    # Hard delete - remove the owned sessions' messages, then the sessions
+                    await db.messages.delete_many({"session_id": {"$in": oids}, "user_id": user_id})
+                    result = await db.sessions.delete_many(owned_filter)
+                    deleted_count = result.deleted_count
+            
+            if deleted_count:
+                self.invalidate_user_caches(user_id)
+            
+            failed_count = len(session_ids) - deleted_count
+            logger.info(f"Bulk deleted {deleted_count} sessions for user {user_id}")
             
             return {
                 "deleted_count": deleted_count,
@@ -637,6 +815,9 @@ class SessionService:
         """
         Get session statistics for a user
         
+        Results are cached briefly per user. Concurrent misses share a single
+        in-flight aggregation instead of each running their own.
+        
         Args:
             user_id: ID of the user
             
@@ -644,51 +825,47 @@ class SessionService:
             Dictionary containing session statistics
         """
         try:
-            db = self._get_db()
-            
-            # Use aggregation pipeline to get comprehensive stats
-            pipeline = [
-                {"$match": {"user_id": user_id}},
-                {"$lookup": {
-                    "from": "messages",
-                    "localField": "_id",
-                    "foreignField": "session_id",
-                    "as": "messages"
-                }},
-                {"$group": {
-                    "_id": None,
-                    "total_sessions": {"$sum": 1},
-                    "pinned_sessions": {"$sum": {"$cond": [{"$eq": ["$is_pinned", True]}, 1, 0]}},
-                    "archived_sessions": {"$sum": {"$cond": [{"$eq": ["$is_archived", True]}, 1, 0]}},
-                    "avg_messages_per_session": {"$avg": {"$size": "$messages"}},
-                    "last_activity": {"$max": "$last_activity"},
-                    "first_session_created": {"$min": "$created_at"}
-                }}
-            ]
-            
-            cursor = db.sessions.aggregate(pipeline)
-            result = await cursor.to_list(length=1)
-            stats = result[0] if result else {}
-            
-            # Get recent activity (sessions in last 7 days)
-            seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
-            recent_count = await db.sessions.count_documents({
-                "user_id": user_id,
-                "last_activity": {"$gte": seven_days_ago}
-            })
-            
-            stats["recent_sessions"] = recent_count
-            
-            return stats
-            
+            return dict(await self._stats_cache.get_or_compute(
+                user_id, lambda: self._compute_session_statistics(user_id)
+            ))
         except Exception as e:
             logger.error(f"Error getting session statistics for user {user_id}: {str(e)}")
             raise
     
+    async def _compute_session_statistics(self, user_id: str) -> Dict[str, Any]:
+        """Run the session statistics aggregation for a user"""
+        db = self.db
+        
+        # Sessions active in the last 7 days are counted in the same pass
+        seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
+        
+        # Use aggregation pipeline to get comprehensive stats
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            {"$group": {
+                "_id": None,
+                "total_sessions": {"$sum": 1},
+                "pinned_sessions": {"$sum": {"$cond": [{"$eq": ["$is_pinned", True]}, 1, 0]}},
+                "archived_sessions": {"$sum": {"$cond": [{"$eq": ["$is_archived", True]}, 1, 0]}},
+                "recent_sessions": {"$sum": {"$cond": [{"$gte": ["$last_activity", seven_days_ago]}, 1, 0]}},
+                "avg_messages_per_session": {"$avg": "$message_count"},
+                "total_messages": {"$sum": "$message_count"},
+                "last_activity": {"$max": "$last_activity"},
+                "first_session_created": {"$min": "$created_at"}
+            }}
+        ]
+        
+        cursor = await db.sessions.aggregate(pipeline)
+        result = await cursor.to_list(length=1)
+        stats = result[0] if result else {"recent_sessions": 0}
+        
+        return stats
+    
     async def get_recent_sessions(
         self, 
         user_id: str, 
-        limit: int = 10
+        limit: int = 10,
+        fields: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Get most recently active sessions for a user
@@ -696,23 +873,45 @@ class SessionService:
         Args:
             user_id: ID of the user
             limit: Maximum number of sessions to return
+            fields: Optional subset of summary fields to return (id is always included)
             
         Returns:
             List of recent session dictionaries
         """
         try:
-            result = await self.get_user_sessions(
-                user_id=user_id,
-                limit=limit,
-                offset=0
-            )
+            # Only full summaries within the cached window come from the cache
+            if fields or limit > RECENT_SESSIONS_CACHE_LIMIT:
+                return await self._fetch_recent_sessions(user_id, limit, fields)
             
-            return result.get("sessions", [])
+            sessions = await self._recent_cache.get_or_compute(
+                user_id,
+                lambda: self._fetch_recent_sessions(user_id, RECENT_SESSIONS_CACHE_LIMIT)
+            )
+            return [dict(session) for session in sessions[:limit]]
             
         except Exception as e:
             logger.error(f"Error getting recent sessions for user {user_id}: {str(e)}")
             raise
     
+    async def _fetch_recent_sessions(
+        self,
+        user_id: str,
+        limit: int,
+        fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Load a user's most recently active sessions"""
+        db = self.db
+        
+        # Top-K read on the (user_id, is_archived, last_activity) index
+        projection = _list_projection(fields)
+        cursor = db.sessions.find(
+            {"user_id": user_id, "is_archived": False},
+            projection
+        ).sort("last_activity", DESCENDING).limit(limit)
+        session_docs = await cursor.to_list(length=limit)
+        
+        return [_summary_doc_to_api(doc, projection) for doc in session_docs]
+    
     async def duplicate_session(
         self, 
         session_id: str, 
@@ -731,32 +930,129 @@ class SessionService:
             Dictionary containing the new session data or None if original not found
         """
         try:
-            # Get original session
-            original_session_dict = await self.get_session(session_id, user_id)
-            if not original_session_dict:
-                return None
+            db = self.db
             
-            # Create new session data
-            new_session_data = {
-                "title": new_title or f"{original_session_dict['title']} (Copy)",
-                "generation_config": original_session_dict.get("generation_config", {}),
-                "metadata": original_session_dict.get("metadata", {}),
-                "tags": original_session_dict.get("tags", []),
-                "is_pinned": False,
-                "is_archived": False
-            }
+            session_oid = parse_object_id(session_id, "session ID")
+            new_session_oid = ObjectId()
             
-            new_session = await self.create_session(user_id, new_session_data)
+            # Stamp the copy like a new session so it sorts and counts as recently active
+            now = datetime.now(timezone.utc)
             
-            # Note: Message duplication would be handled by MessageService
-            # This method just creates the session structure
+            # Copy the session server-side; the copy starts fresh and unorganized,
+            # and its message_count is set once its messages have been copied
+            pipeline = [
+                {"$match": {"_id": session_oid, "user_id": user_id}},
+                {"$addFields": {
+                    "_id": new_session_oid,
+                    # $literal keeps a user title such as "$100 budget" from being read as a field path
+                    "title": {"$literal": new_title} if new_title else {"$concat": ["$title", " (Copy)"]},
+                    "status": "active",
+                    "is_pinned": False,
+                    "is_archived": False,
+                    "message_count": 0,
+                    "created_at": now,
+                    "updated_at": now,
+                    "last_activity": now
+                }},
+                {"$merge": {
+                    "into": "sessions",
+                    "on": "_id",
+                    "whenMatched": "fail",
+                    "whenNotMatched": "insert"
+                }}
+            ]
+            await aggregate_to_list(db.sessions, pipeline)
+            
+            # $merge produces no output, so an empty read means the original was not found
+            session_doc = await db.sessions.find_one({"_id": new_session_oid})
+            if not session_doc:
+                return None
+            
+            # Copy the messages, then count only what was copied. A failed copy
+            # removes the new session and any messages already written, so no
+            # session is left whose message_count disagrees with its messages
+            try:
+                copied_count = await self._copy_session_messages(session_oid, new_session_oid, user_id)
+                session_doc = await db.sessions.find_one_and_update(
+                    {"_id": new_session_oid},
+                    {"$set": {"message_count": copied_count}},
+                    return_document=ReturnDocument.AFTER
+                )
+            except Exception:
+                try:
+                    await asyncio.gather(
+                        db.messages.delete_many({"session_id": new_session_oid}),
+                        db.sessions.delete_one({"_id": new_session_oid})
+                    )
+                except Exception as cleanup_error:
+                    logger.error(f"Error removing partial copy {new_session_oid}: {str(cleanup_error)}")
+                raise
             
-            return new_session
+            self.invalidate_user_caches(user_id)
+            logger.info(f"Duplicated session {session_id} as {new_session_oid} for user {user_id}")
+            
+            return Session(**session_doc).to_dict()
             
         except Exception as e:
             logger.error(f"Error duplicating session {session_id} for user {user_id}: {str(e)}")
             raise
     
+    async def _copy_session_messages(
+        self,
+        session_oid: ObjectId,
+        new_session_oid: ObjectId,
+        user_id: str
+    ) -> int:
+        """
+        Copy a session's messages into another session in transcript order
+        
+        Ids are generated here rather than by the server so each copy's _id
+        carries its created_at and follows the original's position; $merge
+        would insert in no guaranteed order.
+        
+        Returns:
+            Number of messages copied
+        """
+        db = self.db
+        
+        message_cursor = db.messages.find(
+            {"session_id": session_oid, "user_id": user_id}
+        ).sort("_id", ASCENDING).batch_size(DUPLICATE_MESSAGE_BATCH_SIZE)
+        
+        copied_count = 0
+        batch = []
+        async for message_doc in message_cursor:
+            created_at = message_doc.get("created_at") or message_doc["_id"].generation_time
+            message_doc["_id"] = _copy_object_id(created_at)
+            message_doc["session_id"] = new_session_oid
+            batch.append(message_doc)
+            if len(batch) >= DUPLICATE_MESSAGE_BATCH_SIZE:
+                copied_count += await self._insert_message_batch(batch, new_session_oid)
+                batch = []
+        if batch:
+            copied_count += await self._insert_message_batch(batch, new_session_oid)
+        
+        return copied_count
+    
+    async def _insert_message_batch(self, batch: List[Dict[str, Any]], new_session_oid: ObjectId) -> int:
+        """
+        Insert one batch of copied messages and return how many were written
+        
+        The batch is unordered, so the server applies it in one pass and a
+        rejected document does not stop the rest; rejected documents are
+        logged and left out of the count instead of failing the copy.
+        """
+        try:
+            result = await self.db.messages.insert_many(batch, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                logger.warning(
+                    f"Skipped message {error.get('index')} of a batch copied into "
+                    f"session {new_session_oid}: {error.get('errmsg')}"
+                )
+            return e.details.get("nInserted", 0)
+    
     async def update_activity(self, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """
         Update session activity timestamp
@@ -769,28 +1065,28 @@ class SessionService:
             Updated session data or None if not found
         """
         try:
-            db = self._get_db()
+            db = self.db
             
-            session_doc = await db.sessions.find_one({
-                "_id": ObjectId(session_id),
-                "user_id": user_id
-            })
+            session_oid = parse_object_id(session_id, "session ID")
             
-            if not session_doc:
-                return None
-            
-            session = Session(**session_doc)
-            session.update_activity()
-            
-            await db.sessions.update_one(
-                {"_id": ObjectId(session_id)},
+            now = datetime.now(timezone.utc)
+            session_doc = await db.sessions.find_one_and_update(
+                {
+                    "_id": session_oid,
+                    "user_id": user_id
+                },
                 {"$set": {
-                    "last_activity": session.last_activity,
-                    "updated_at": session.updated_at
-                }}
+                    "last_activity": now,
+                    "updated_at": now
+                }},
+                return_document=ReturnDocument.AFTER
             )
             
-            return session.to_dict()
+            if not session_doc:
+                return None
+            
+            self.invalidate_user_caches(user_id)
+            return Session(**session_doc).to_dict()
             
         except Exception as e:
             logger.error(f"Error updating activity for session {session_id}: {str(e)}")
@@ -808,29 +1104,31 @@ class SessionService:
             Updated session data or None if not found
         """
         try:
-            db = self._get_db()
+            db = self.db
             
-            session_doc = await db.sessions.find_one({
-                "_id": ObjectId(session_id),
-                "user_id": user_id
-            })
+            session_oid = parse_object_id(session_id, "session ID")
+            
+            now = datetime.now(timezone.utc)
+            session_doc = await db.sessions.find_one_and_update(
+                {
+                    "_id": session_oid,
+                    "user_id": user_id
+                },
+                {
+                    "$inc": {"message_count": 1},
+                    "$set": {
+                        "last_activity": now,
+                        "updated_at": now
+                    }
+                },
+                return_document=ReturnDocument.AFTER
+            )
             
             if not session_doc:
                 return None
             
-            session = Session(**session_doc)
-            session.increment_message_count()
-            
-            await db.sessions.update_one(
-                {"_id": ObjectId(session_id)},
-                {"$set": {
-                    "message_count": session.message_count,
-                    "last_activity": session.last_activity,
-                    "updated_at": session.updated_at
-                }}
-            )
-            
-            return session.to_dict()
+            self.invalidate_user_caches(user_id)
+            return Session(**session_doc).to_dict()
             
         except Exception as e:
             logger.error(f"Error incrementing message count for session {session_id}: {str(e)}")
@@ -0,0 +1,8 @@
+import os
+
+# Settings are read at import time; give them what they need without a .env file
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+# Importing config first resolves the config -> services -> database import cycle
+import app.core.config  # noqa: E402,F401
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.core.utils import cache as cache_module
+from app.core.utils import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(ttl=10)
+    cache.set("a", 1)
+    
+    clock.now += 9.9
+    assert cache.get("a") == 1
+    
+    clock.now += 0.1
+    assert cache.get("a") is None
+    assert "a" not in cache
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_pop_and_clear(clock):
+    cache = TTLCache(ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "missing") == "missing"
+    assert len(cache) == 1
+    
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get("b") is None
+
+
+@pytest.mark.asyncio
+async def test_get_or_compute_coalesces_concurrent_misses():
+    cache = TTLCache(ttl=10)
+    calls = 0
+    release = asyncio.Event()
+    
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"total": 3}
+    
+    pending = [asyncio.ensure_future(cache.get_or_compute("user-1", compute)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*pending)
+    
+    assert calls == 1
+    assert results == [{"total": 3}] * 3
+    assert await cache.get_or_compute("user-1", compute) == {"total": 3}
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_compute_propagates_and_evicts_failures():
+    cache = TTLCache(ttl=10)
+    
+    async def fail():
+        raise RuntimeError("database unavailable")
+    
+    async def succeed():
+        return 42
+    
+    with pytest.raises(RuntimeError, match="database unavailable"):
+        await cache.get_or_compute("user-1", fail)
+    assert "user-1" not in cache
+    
+    assert await cache.get_or_compute("user-1", succeed) == 42
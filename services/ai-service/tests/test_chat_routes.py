@@ -0,0 +1,34 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import get_message_service, get_session_service
+from app.core.security import get_current_user
+from app.models.user import User
+from app.routes import chat_router
+from app.services.message_service import MessageService
+from app.services.session_service import SessionService
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(chat_router)
+    message_service = MessageService()
+    message_service.db = MagicMock()
+    session_service = SessionService()
+    session_service.db = MagicMock()
+    app.dependency_overrides[get_current_user] = lambda: User(id="user-1", email="user@studybuddy.com")
+    app.dependency_overrides[get_message_service] = lambda: message_service
+    app.dependency_overrides[get_session_service] = lambda: session_service
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/api/v1/chats/messages", "/api/v1/chats/sessions"])
+def test_malformed_cursor_is_a_bad_request(client, path):
+    response = client.get(path, params={"cursor": "not a cursor"})
+    
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
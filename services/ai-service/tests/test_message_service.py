@@ -0,0 +1,239 @@
+import base64
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+from app.models.message import Message
+from app.services.message_service import (
+    LIST_PROJECTION,
+    MessageService,
+    _doc_to_api,
+    _encode_cursor,
+    _keyset_filter,
+)
+
+
+def _cursor(docs):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=docs)
+    return cursor
+
+
+@pytest.fixture
+def service():
+    service = MessageService()
+    service.db = MagicMock()
+    return service
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("message_ids", [[], ["not-an-id", "1234"]])
+async def test_bulk_delete_without_valid_ids_skips_the_database(service, message_ids):
+    result = await service.bulk_delete_messages(message_ids, "user-1")
+    
+    assert result == {
+        "deleted_count": 0,
+        "failed_count": len(message_ids),
+        "total_requested": len(message_ids),
+        "affected_sessions": 0
+    }
+    service.db.messages.find.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_text_search_is_scoped_to_the_user(service):
+    session_id = ObjectId()
+    service.db.messages.aggregate = AsyncMock(return_value=_cursor([]))
+    service.db.sessions.find_one = AsyncMock(return_value={"_id": session_id})
+    
+    await service.search_session_messages(str(session_id), "user-1", "photosynthesis")
+    
+    pipeline = service.db.messages.aggregate.await_args.args[0]
+    assert pipeline[0]["$match"]["user_id"] == "user-1"
+    assert pipeline[0]["$match"]["$text"] == {"$search": "photosynthesis"}
+
+
+@pytest.mark.asyncio
+async def test_search_returns_whole_messages_by_default(service):
+    session_id = ObjectId()
+    service.db.messages.aggregate = AsyncMock(return_value=_cursor([]))
+    service.db.sessions.find_one = AsyncMock(return_value={"_id": session_id})
+    
+    await service.search_session_messages(str(session_id), "user-1", "photosynthesis")
+    
+    pipeline = service.db.messages.aggregate.await_args.args[0]
+    assert not any("$project" in stage for stage in pipeline)
+
+
+@pytest.mark.asyncio
+async def test_user_messages_return_whole_messages_by_default(service):
+    find_cursor = MagicMock()
+    find_cursor.sort.return_value = find_cursor
+    find_cursor.skip.return_value = find_cursor
+    find_cursor.limit.return_value = find_cursor
+    find_cursor.batch_size.return_value = find_cursor
+    find_cursor.to_list = AsyncMock(return_value=[])
+    service.db.messages.find = MagicMock(return_value=find_cursor)
+    
+    await service.get_user_messages("user-1")
+    
+    assert service.db.messages.find.call_args.args[1] is None
+
+
+@pytest.mark.asyncio
+async def test_message_writes_drop_session_caches():
+    on_session_change = MagicMock()
+    service = MessageService(on_session_change=on_session_change)
+    service.db = MagicMock()
+    session_oid = ObjectId()
+    service.db.sessions.find_one_and_update = AsyncMock(return_value={"_id": session_oid})
+    service.db.sessions.update_one = AsyncMock()
+    service.db.messages.insert_one = AsyncMock()
+    service.db.messages.find_one_and_delete = AsyncMock(return_value={"session_id": session_oid})
+    
+    await service.create_message("user-1", {
+        "session_id": str(session_oid), "role": "user", "content": "hello"
+    })
+    on_session_change.assert_called_once_with("user-1")
+    
+    on_session_change.reset_mock()
+    await service.delete_message(str(ObjectId()), "user-1")
+    on_session_change.assert_called_once_with("user-1")
+
+
+def test_dependency_wiring_shares_the_session_cache_hook():
+    from app.core.config.dependencies import get_message_service, get_session_service
+    
+    session_service = get_session_service()
+    session_service._recent_cache.set("user-1", ["stale"])
+    
+    get_message_service()._on_session_change("user-1")
+    
+    assert "user-1" not in session_service._recent_cache
+
+
+
+def _token(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+@pytest.mark.parametrize("direction, op", [(DESCENDING, "$lt"), (ASCENDING, "$gt")])
+def test_id_cursor_round_trips(direction, op):
+    message_id = ObjectId()
+    
+    cursor = _encode_cursor({"_id": message_id, "content": "hello"})
+    
+    assert _keyset_filter(cursor, direction) == {"_id": {op: message_id}}
+
+
+def test_score_cursor_round_trips():
+    message_id = ObjectId()
+    
+    cursor = _encode_cursor({"_id": message_id, "score": 1.5}, "score")
+    
+    assert _keyset_filter(cursor, DESCENDING, "score") == {
+        "$or": [
+            {"score": {"$lt": 1.5}},
+            {"score": 1.5, "_id": {"$lt": message_id}}
+        ]
+    }
+
+
+@pytest.mark.parametrize("cursor, sort_field", [
+    ("not a cursor", None),
+    (base64.urlsafe_b64encode(b"not json").decode(), None),
+    (_token(["not-an-object-id"]), None),
+    (_token([]), None),
+    (_token([str(ObjectId())]), "score"),
+])
+def test_malformed_cursors_raise_value_error(cursor, sort_field):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        _keyset_filter(cursor, DESCENDING, sort_field)
+
+
+@pytest.mark.asyncio
+async def test_malformed_cursor_is_rejected_before_querying(service):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        await service.get_user_messages("user-1", cursor="not a cursor")
+    
+    service.db.messages.find.assert_not_called()
+
+
+
+def _stored_message():
+    """A message document as create_message stores it, without its None fields"""
+    message = Message(session_id=ObjectId(), user_id="user-1", role="user", content="hello")
+    doc = message.model_dump(by_alias=True, exclude_none=True)
+    doc["session_id"] = ObjectId(doc["session_id"])
+    return message, doc
+
+
+def test_doc_to_api_matches_message_to_dict():
+    message, doc = _stored_message()
+    
+    assert _doc_to_api(doc) == message.to_dict()
+
+
+def test_doc_to_api_with_a_projection_fills_only_projected_fields():
+    _, doc = _stored_message()
+    summary = {field: doc[field] for field in LIST_PROJECTION if field in doc}
+    
+    result = _doc_to_api(summary, LIST_PROJECTION)
+    
+    assert set(result) == {"id", *LIST_PROJECTION} - {"_id"}
+
+
+@pytest.mark.asyncio
+async def test_thread_target_and_context_share_one_shape(service):
+    message, target_doc = _stored_message()
+    _, context_doc = _stored_message()
+    context_doc["session_id"] = target_doc["session_id"]
+    context_doc["_id"] = ObjectId()
+    service.db.messages.find_one = AsyncMock(return_value=target_doc)
+    service.db.messages.aggregate = AsyncMock(return_value=_cursor([context_doc]))
+    
+    thread = await service.get_message_thread(str(message.id), "user-1")
+    
+    target, context = thread["messages"]
+    assert target == message.to_dict()
+    assert set(context) == set(target)
+
+
+
+@pytest.mark.asyncio
+async def test_search_keeps_relevance_score_ranks_and_hides_the_text_score(service):
+    session_id = ObjectId()
+    docs = [
+        {"_id": ObjectId(), "session_id": session_id, "content": "Photosynthesis in leaves",
+         "score": 1.1, "relevance_score": 1},
+        {"_id": ObjectId(), "session_id": session_id, "content": "photosynthetic pigments",
+         "score": 0.6, "relevance_score": 2},
+    ]
+    service.db.messages.aggregate = AsyncMock(return_value=_cursor(docs))
+    service.db.sessions.find_one = AsyncMock(return_value={"_id": session_id})
+    
+    result = await service.search_session_messages(str(session_id), "user-1", "photosynthesis")
+    
+    pipeline = service.db.messages.aggregate.await_args.args[0]
+    rank = pipeline[-1]["$addFields"]["relevance_score"]["$cond"]
+    assert rank[0]["$regexMatch"]["regex"] == r"\bphotosynthesis\b"
+    assert rank[1:] == [1, 2]
+    assert [message["relevance_score"] for message in result["messages"]] == [1, 2]
+    assert all("score" not in message for message in result["messages"])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("context_size", [0, -1])
+async def test_thread_without_context_returns_only_the_target(service, context_size):
+    message, target_doc = _stored_message()
+    service.db.messages.find_one = AsyncMock(return_value=target_doc)
+    service.db.messages.aggregate = AsyncMock()
+    
+    thread = await service.get_message_thread(str(message.id), "user-1", context_size=context_size)
+    
+    assert thread["messages"] == [message.to_dict()]
+    assert thread["total_context"] == 1
+    service.db.messages.aggregate.assert_not_called()
@@ -0,0 +1,213 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import base64
+import json
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timedelta, timezone
+
+from app.services import session_service as session_module
+from app.services.session_service import (
+    SessionService,
+    _encode_session_cursor,
+    _session_keyset_filter,
+)
+
+
+class FakeCursor:
+    """Async-iterable stand-in for a find() cursor over fixed documents"""
+    
+    def __init__(self, docs):
+        self.docs = docs
+    
+    def sort(self, *args, **kwargs):
+        return self
+    
+    def batch_size(self, size):
+        return self
+    
+    def __aiter__(self):
+        return self._iterate()
+    
+    async def _iterate(self):
+        for doc in self.docs:
+            yield dict(doc)
+
+
+@pytest.fixture
+def service():
+    service = SessionService()
+    service.db = MagicMock()
+    return service
+
+
+@pytest.mark.asyncio
+async def test_soft_delete_of_an_already_deleted_session_succeeds(service):
+    # The status is already "deleted", so the update matches without modifying
+    service.db.sessions.update_one = AsyncMock(
+        return_value=MagicMock(matched_count=1, modified_count=0)
+    )
+    
+    assert await service.delete_session(str(ObjectId()), "user-1") is True
+    
+    update_filter = service.db.sessions.update_one.await_args.args[0]
+    assert "status" not in update_filter
+
+
+@pytest.mark.asyncio
+async def test_soft_delete_of_a_missing_session_fails(service):
+    service.db.sessions.update_one = AsyncMock(
+        return_value=MagicMock(matched_count=0, modified_count=0)
+    )
+    
+    assert await service.delete_session(str(ObjectId()), "user-1") is False
+
+
+@pytest.mark.asyncio
+async def test_bulk_soft_delete_counts_already_deleted_sessions(service):
+    # Two owned sessions match, one of them already deleted; one id is malformed
+    service.db.sessions.update_many = AsyncMock(
+        return_value=MagicMock(matched_count=2, modified_count=1)
+    )
+    
+    result = await service.bulk_delete_sessions(
+        [str(ObjectId()), str(ObjectId()), "not-an-id"], "user-1"
+    )
+    
+    assert result == {"deleted_count": 2, "failed_count": 1, "total_requested": 3}
+    update_filter = service.db.sessions.update_many.await_args.args[0]
+    assert "status" not in update_filter
+
+
+def _stub_session_copy(service, originals):
+    """Stub the session copy so duplicate_session reaches its message copy"""
+    copy = {"_id": ObjectId(), "user_id": "user-1", "title": "Notes (Copy)", "message_count": 0}
+    
+    async def insert_many(batch, **kwargs):
+        return MagicMock(inserted_ids=[doc["_id"] for doc in batch])
+    
+    async def set_message_count(query, update, **kwargs):
+        return {**copy, **update["$set"]}
+    
+    service.db.sessions.aggregate = AsyncMock(return_value=MagicMock(to_list=AsyncMock(return_value=[])))
+    service.db.sessions.find_one = AsyncMock(return_value=copy)
+    service.db.sessions.find_one_and_update = AsyncMock(side_effect=set_message_count)
+    service.db.messages.find = MagicMock(return_value=FakeCursor(originals))
+    service.db.messages.insert_many = AsyncMock(side_effect=insert_many)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_session_copies_messages_in_transcript_order(service, monkeypatch):
+    monkeypatch.setattr(session_module, "DUPLICATE_MESSAGE_BATCH_SIZE", 2)
+    session_oid = ObjectId()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    # Two messages share a second, so their order rests on the id counter
+    originals = [
+        {"_id": ObjectId(), "session_id": session_oid, "user_id": "user-1",
+         "content": f"message {i}", "created_at": start + timedelta(seconds=i // 2)}
+        for i in range(5)
+    ]
+    _stub_session_copy(service, originals)
+    
+    duplicate = await service.duplicate_session(str(session_oid), "user-1")
+    
+    batches = [call.args[0] for call in service.db.messages.insert_many.await_args_list]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    copies = [doc for batch in batches for doc in batch]
+    assert [doc["content"] for doc in copies] == [doc["content"] for doc in originals]
+    ids = [doc["_id"] for doc in copies]
+    assert ids == sorted(ids)
+    assert not set(ids) & {doc["_id"] for doc in originals}
+    for copy, original in zip(copies, originals):
+        assert copy["_id"].generation_time == original["created_at"]
+        assert copy["session_id"] != session_oid
+    
+    assert service.db.sessions.find_one_and_update.await_args.args[1] == {"$set": {"message_count": 5}}
+    assert duplicate["message_count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_failed_duplicate_removes_the_partial_copy(service, monkeypatch):
+    monkeypatch.setattr(session_module, "DUPLICATE_MESSAGE_BATCH_SIZE", 2)
+    session_oid = ObjectId()
+    originals = [
+        {"_id": ObjectId(), "session_id": session_oid, "user_id": "user-1",
+         "content": f"message {i}", "created_at": datetime.now(timezone.utc)}
+        for i in range(4)
+    ]
+    _stub_session_copy(service, originals)
+    service.db.messages.insert_many.side_effect = [
+        MagicMock(inserted_ids=[1, 2]),
+        RuntimeError("connection reset")
+    ]
+    service.db.messages.delete_many = AsyncMock()
+    service.db.sessions.delete_one = AsyncMock()
+    
+    with pytest.raises(RuntimeError, match="connection reset"):
+        await service.duplicate_session(str(session_oid), "user-1")
+    
+    new_session_oid = service.db.sessions.delete_one.await_args.args[0]["_id"]
+    assert new_session_oid != session_oid
+    service.db.messages.delete_many.assert_awaited_once_with({"session_id": new_session_oid})
+    service.db.sessions.find_one_and_update.assert_not_awaited()
+
+
+
+def test_session_cursor_round_trips():
+    session_oid = ObjectId()
+    last_activity = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    
+    cursor = _encode_session_cursor({"_id": session_oid, "last_activity": last_activity})
+    
+    assert _session_keyset_filter(cursor) == {
+        "$or": [
+            {"last_activity": {"$lt": last_activity}},
+            {"last_activity": last_activity, "_id": {"$lt": session_oid}},
+            {"last_activity": None}
+        ]
+    }
+
+
+def test_session_cursor_without_last_activity_pages_legacy_sessions():
+    session_oid = ObjectId()
+    
+    cursor = _encode_session_cursor({"_id": session_oid})
+    
+    assert _session_keyset_filter(cursor) == {"last_activity": None, "_id": {"$lt": session_oid}}
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(json.dumps(["not-an-object-id", None]).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps([str(ObjectId()), "yesterday"]).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps([str(ObjectId())]).encode()).decode(),
+])
+def test_malformed_session_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        _session_keyset_filter(cursor)
+
+
+
+@pytest.mark.asyncio
+async def test_duplicate_counts_only_messages_a_partial_batch_inserted(service, monkeypatch):
+    monkeypatch.setattr(session_module, "DUPLICATE_MESSAGE_BATCH_SIZE", 2)
+    session_oid = ObjectId()
+    originals = [
+        {"_id": ObjectId(), "session_id": session_oid, "user_id": "user-1",
+         "content": f"message {i}", "created_at": datetime.now(timezone.utc)}
+        for i in range(3)
+    ]
+    _stub_session_copy(service, originals)
+    service.db.messages.insert_many.side_effect = [
+        BulkWriteError({"nInserted": 1, "writeErrors": [{"index": 1, "code": 121, "errmsg": "invalid"}]}),
+        MagicMock(inserted_ids=[ObjectId()])
+    ]
+    
+    duplicate = await service.duplicate_session(str(session_oid), "user-1")
+    
+    assert duplicate["message_count"] == 2
+    for call in service.db.messages.insert_many.await_args_list:
+        assert call.kwargs == {"ordered": False}